@@ -16,6 +16,18 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file upload
+
+    # Extract PDFs on a worker thread after the upload response. Only turn this on
+    # for a long-running server - serverless hosts like Vercel may stop work once
+    # the response is sent, so by default PDFs are extracted during the upload.
+    BACKGROUND_EXTRACTION = os.environ.get('BACKGROUND_EXTRACTION', '').lower() in ('1', 'true', 'yes')
+    EXTRACTION_TIMEOUT_MINUTES = 10  # Uploads still processing after this are marked failed
+
+    # Answer chat questions sent in quick succession with one Groq request.
+    # Each question first waits a short window for others to join it, so only
+    # turn this on for a long-running server; on serverless hosts every request
+    # runs on its own and the wait is pure latency.
+    CHAT_COALESCING = os.environ.get('CHAT_COALESCING', '').lower() in ('1', 'true', 'yes')
     
     # Groq API Key (Free!) - Get yours at https://console.groq.com/keys
     GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
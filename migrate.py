@@ -17,6 +17,16 @@ def migrate():
         except Exception as e:
             print(f"Note: {e}")
         
+        # Add status column to study_file if it doesn't exist
+        try:
+            db.session.execute(text("""
+                ALTER TABLE study_file 
+                ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'ready'
+            """))
+            print("✓ Added status to study_file")
+        except Exception as e:
+            print(f"Note: {e}")
+        
         # Create subject table if it doesn't exist
         try:
             db.session.execute(text("""
@@ -120,6 +130,18 @@ def migrate():
         except Exception as e:
             print(f"Note: {e}")
         
+        # Let the database cascade chat history when a study file is deleted
+        try:
+            db.session.execute(text("""
+                ALTER TABLE bot_conversation
+                DROP CONSTRAINT IF EXISTS bot_conversation_file_id_fkey,
+                ADD CONSTRAINT bot_conversation_file_id_fkey
+                    FOREIGN KEY (file_id) REFERENCES study_file(id) ON DELETE CASCADE
+            """))
+            print("✓ Added ON DELETE CASCADE to bot_conversation.file_id")
+        except Exception as e:
+            print(f"Note: {e}")
+        
         db.session.commit()
         print("\n✅ Migration complete!")
 
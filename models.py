@@ -4,9 +4,20 @@ Database Models
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sqlite3
 
 db = SQLAlchemy()
 
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores ON DELETE CASCADE unless foreign keys are switched on"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
 class ChatTheme(db.Model):
     """Per-conversation chat theme for each user"""
     id = db.Column(db.Integer, primary_key=True)
@@ -142,6 +153,7 @@ class StudyFile(db.Model):
     filename = db.Column(db.String(255), nullable=False)
     original_name = db.Column(db.String(255), nullable=False)
     content = db.Column(db.Text)  # Extracted text content
+    status = db.Column(db.String(20), default='ready')  # processing, ready, failed
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     subject = db.relationship('Subject', backref='files')
@@ -161,13 +173,16 @@ class BotConversation(db.Model):
     """Stores chat history between user and study bot"""
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    file_id = db.Column(db.Integer, db.ForeignKey('study_file.id'), nullable=False)
+    file_id = db.Column(db.Integer, db.ForeignKey('study_file.id', ondelete='CASCADE'), nullable=False)
     role = db.Column(db.String(10), nullable=False)  # 'user' or 'bot'
     content = db.Column(db.Text, nullable=False)
     sent_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     user = db.relationship('User', backref='bot_conversations')
-    file = db.relationship('StudyFile', backref='conversations')
+    # Chat history is removed by the database when its file is deleted
+    file = db.relationship('StudyFile', backref=db.backref(
+        'conversations', cascade='all, delete-orphan', passive_deletes=True
+    ))
 
 
 # Subject icon mapping to Iconoir icon names
@@ -1,27 +1,48 @@
 """
 Study Routes - File upload, Quiz, Bot interaction
 """
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from models import db, StudyFile, StudySession, BotConversation, Subject, SubjectProgress
 from services.bot import StudyBot
+from io import BytesIO
+from lxml import etree
+from pptx import Presentation
+from docx import Document
+from PyPDF2 import PdfReader
+import openpyxl
+import asyncio
+import json
 import os
+import tempfile
+import zipfile
+
+try:
+    import pandas as pd
+except ImportError:  # pandas is optional; fall back to openpyxl row iteration
+    pd = None
 
 study_bp = Blueprint('study', __name__)
 ALLOWED_EXTENSIONS = {'txt', 'md', 'pptx', 'docx', 'xlsx', 'pdf'}
+_ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in ALLOWED_EXTENSIONS)
+
+# PDFs are slow to parse, so with BACKGROUND_EXTRACTION on their text is
+# extracted off the request thread from a copy saved under UPLOAD_FOLDER
+BACKGROUND_EXTENSIONS = ('.pdf',)
+PENDING_SUBFOLDER = 'pending'
+_extract_executor = ThreadPoolExecutor(max_workers=2)
 
 def extract_text_from_file(file, filename):
     """Extract text content from various file types"""
-    ext = filename.rsplit('.', 1)[1].lower()
+    ext = filename[filename.rindex('.') + 1:].lower()
     
     if ext in ['txt', 'md']:
         return file.read().decode('utf-8')
     
     elif ext == 'pptx':
-        from pptx import Presentation
-        from io import BytesIO
         prs = Presentation(BytesIO(file.read()))
         text_parts = []
         for slide in prs.slides:
@@ -31,16 +52,20 @@ def extract_text_from_file(file, filename):
         return '\n\n'.join(text_parts)
     
     elif ext == 'docx':
-        from docx import Document
-        from io import BytesIO
-        doc = Document(BytesIO(file.read()))
-        text_parts = [para.text for para in doc.paragraphs if para.text.strip()]
+        data = file.read()
+        try:
+            text_parts = _stream_docx_paragraphs(data)
+        except (KeyError, zipfile.BadZipFile, etree.XMLSyntaxError):
+            # Unusual packaging - let python-docx deal with it
+            doc = Document(BytesIO(data))
+            text_parts = [para.text for para in doc.paragraphs if para.text.strip()]
         return '\n\n'.join(text_parts)
     
     elif ext == 'xlsx':
-        import openpyxl
-        from io import BytesIO
-        wb = openpyxl.load_workbook(BytesIO(file.read()))
+        data = file.read()
+        if pd is not None:
+            return _extract_xlsx_with_pandas(data)
+        wb = openpyxl.load_workbook(BytesIO(data))
         text_parts = []
         for sheet in wb.worksheets:
             text_parts.append(f"Sheet: {sheet.title}")
@@ -51,8 +76,6 @@ def extract_text_from_file(file, filename):
         return '\n'.join(text_parts)
     
     elif ext == 'pdf':
-        from PyPDF2 import PdfReader
-        from io import BytesIO
         reader = PdfReader(BytesIO(file.read()))
         text_parts = []
         for page in reader.pages:
@@ -63,12 +86,121 @@ def extract_text_from_file(file, filename):
     
     return ""
 
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Text equivalents of run content other than <w:t>, as python-docx renders them
+_W_RUN_TEXT = {
+    _W_NS + 'tab': '\t',
+    _W_NS + 'ptab': '\t',
+    _W_NS + 'cr': '\n',
+    _W_NS + 'noBreakHyphen': '-',
+}
+
+def _docx_run_text(run):
+    """Text of a <w:r>, keeping tabs and line breaks"""
+    parts = []
+    for child in run:
+        if child.tag == _W_NS + 't':
+            parts.append(child.text or '')
+        elif child.tag == _W_NS + 'br':
+            # Page and column breaks have no text equivalent
+            if child.get(_W_NS + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        else:
+            parts.append(_W_RUN_TEXT.get(child.tag, ''))
+    return ''.join(parts)
+
+def _stream_docx_paragraphs(data):
+    """Stream paragraph text out of word/document.xml without building a DOM"""
+    text_parts = []
+    with zipfile.ZipFile(BytesIO(data)) as z, z.open('word/document.xml') as f:
+        for _, para in etree.iterparse(f, tag=_W_NS + 'p'):
+            text = ''.join(_docx_run_text(run) for run in para.iter(_W_NS + 'r'))
+            if text.strip():
+                text_parts.append(text)
+            # Free this paragraph and everything parsed before it
+            para.clear()
+            while para.getprevious() is not None:
+                del para.getparent()[0]
+    return text_parts
+
+def _extract_xlsx_with_pandas(data):
+    """Extract xlsx text with pandas so the per-cell join runs vectorized"""
+    sheets = pd.read_excel(BytesIO(data), sheet_name=None, header=None,
+                           dtype=str, na_filter=False, engine='openpyxl')
+    text_parts = []
+    for name, df in sheets.items():
+        text_parts.append(f"Sheet: {name}")
+        # Drop empty cells, then join what's left of each row with ' | '
+        cells = df.replace('', pd.NA).stack().dropna()
+        if cells.empty:
+            continue
+        rows = cells.groupby(level=0).agg(' | '.join)
+        rows = rows[rows.str.strip() != '']
+        if not rows.empty:
+            text_parts.append(rows.str.cat(sep='\n'))
+    return '\n'.join(text_parts)
+
+def _pending_folder(app):
+    """Folder holding uploads that are waiting for background extraction"""
+    folder = os.path.join(app.config.get('UPLOAD_FOLDER', 'uploads'), PENDING_SUBFOLDER)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def _pending_path(app, file_id):
+    return os.path.join(_pending_folder(app), f'{file_id}.upload')
+
+def _discard_pending(app, file_id):
+    try:
+        os.remove(_pending_path(app, file_id))
+    except FileNotFoundError:
+        pass
+
+def _extract_file_in_background(app, file_id, filename):
+    """Extract text for an uploaded file and mark it ready (or failed)"""
+    with app.app_context():
+        try:
+            with open(_pending_path(app, file_id), 'rb') as f:
+                content = extract_text_from_file(f, filename)
+        except Exception as e:
+            print(f"Extraction error for file {file_id}: {e}")
+            content = None
+        finally:
+            _discard_pending(app, file_id)
+        
+        study_file = StudyFile.query.get(file_id)
+        if not study_file:
+            return  # Deleted while we were processing
+        
+        if content and len(content.strip()) >= 10:
+            study_file.content = content
+            study_file.status = 'ready'
+        else:
+            study_file.status = 'failed'
+        db.session.commit()
+
+def _fail_stale_extractions(user_id):
+    """Mark uploads stuck in processing (e.g. the worker died on restart) as failed"""
+    app = current_app._get_current_object()
+    cutoff = datetime.utcnow() - timedelta(minutes=app.config.get('EXTRACTION_TIMEOUT_MINUTES', 10))
+    stale = StudyFile.query.filter(
+        StudyFile.user_id == user_id,
+        StudyFile.status == 'processing',
+        StudyFile.uploaded_at < cutoff
+    ).all()
+    
+    for study_file in stale:
+        study_file.status = 'failed'
+        _discard_pending(app, study_file.id)
+    if stale:
+        db.session.commit()
+
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
 
 @study_bp.route('/study')
 @login_required
 def study_page():
+    _fail_stale_extractions(current_user.id)
     files = StudyFile.query.filter_by(user_id=current_user.id).all()
     subjects = Subject.query.filter_by(user_id=current_user.id).all()
     return render_template('study.html', files=files, subjects=subjects)
@@ -143,6 +275,9 @@ def upload_file():
     
     uploaded_files = []
     errors = []
+    pending_extractions = []
+    app = current_app._get_current_object()
+    background = app.config.get('BACKGROUND_EXTRACTION', False)
     
     for file in files:
         if file.filename == '':
@@ -155,22 +290,37 @@ def upload_file():
         filename = secure_filename(file.filename)
         
         try:
-            content = extract_text_from_file(file, filename)
-            
-            if not content or len(content.strip()) < 10:
-                errors.append(f'{file.filename}: Could not extract text or file is empty')
-                continue
+            pending_tmp = None
+            if background and filename.lower().endswith(BACKGROUND_EXTENSIONS):
+                # Save to disk now, extract after the response has been sent
+                fd, pending_tmp = tempfile.mkstemp(dir=_pending_folder(app))
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(file.read())
+                content = None
+                status = 'processing'
+            else:
+                content = extract_text_from_file(file, filename)
+                
+                if not content or len(content.strip()) < 10:
+                    errors.append(f'{file.filename}: Could not extract text or file is empty')
+                    continue
+                status = 'ready'
             
             study_file = StudyFile(
                 user_id=current_user.id,
                 subject_id=int(subject_id) if subject_id else None,
                 filename=filename,
                 original_name=file.filename,
-                content=content
+                content=content,
+                status=status
             )
             db.session.add(study_file)
             db.session.flush()  # Get the ID before commit
             
+            if pending_tmp is not None:
+                os.replace(pending_tmp, _pending_path(app, study_file.id))
+                pending_extractions.append((study_file.id, filename))
+            
             # Get subject info for response
             subject_info = None
             if study_file.subject_id:
@@ -189,15 +339,22 @@ def upload_file():
                 'filename': filename,
                 'original_name': file.filename,
                 'uploaded_at': datetime.utcnow().strftime('%b %d'),
-                'subject': subject_info
+                'subject': subject_info,
+                'status': status
             })
             
         except Exception as e:
+            if pending_tmp and os.path.exists(pending_tmp):
+                os.remove(pending_tmp)
             errors.append(f'{file.filename}: Error processing - {str(e)}')
     
     if uploaded_files:
         db.session.commit()
         
+        # Rows are committed, so the workers can find them
+        for file_id, filename in pending_extractions:
+            _extract_executor.submit(_extract_file_in_background, app, file_id, filename)
+        
         response = {
             'success': True,
             'uploaded_count': len(uploaded_files),
@@ -207,7 +364,8 @@ def upload_file():
         if errors:
             response['warnings'] = errors
         
-        return jsonify(response)
+        # 202 tells the client some files are still processing
+        return jsonify(response), 202 if pending_extractions else 200
     
     # No files were uploaded successfully
     error_msg = '; '.join(errors) if errors else 'No valid files to upload'
@@ -215,6 +373,14 @@ def upload_file():
 
 from flask import session as flask_session
 
+def _not_ready_response(study_file):
+    """409 for files whose text isn't available (rows from before status existed are ready)"""
+    if study_file.status in (None, 'ready'):
+        return None
+    if study_file.status == 'failed':
+        return jsonify({'error': 'Could not extract text from this file'}), 409
+    return jsonify({'error': 'File is still being processed'}), 409
+
 @study_bp.route('/bot/action', methods=['POST'])
 @login_required
 def bot_action():
@@ -228,6 +394,10 @@ def bot_action():
     if not study_file or study_file.user_id != current_user.id:
         return jsonify({'error': 'File not found'}), 404
     
+    not_ready = _not_ready_response(study_file)
+    if not_ready:
+        return not_ready
+    
     # Get or create conversation history for this file
     history_key = f'bot_history_{current_user.id}_{file_id}'
     conversation_history = flask_session.get(history_key, [])
@@ -242,21 +412,97 @@ def bot_action():
         result = bot.generate_quiz(num_questions=count, question_type=question_type)
     elif action == 'flashcards':
         result = bot.generate_flashcards()
+    elif action == 'study_pack':
+        # Quiz + flashcards in one go, requested concurrently
+        count = config.get('count', 5)
+        question_type = config.get('type', 'mixed')
+        result = asyncio.run(bot.generate_study_pack(num_questions=count, question_type=question_type))
     elif action == 'question':
         result = bot.ask_question()
     elif action == 'ask':
-        result = bot.answer_question(user_input)
+        # With CHAT_COALESCING on, rapid-fire questions in this conversation share one Groq request
+        batch_key = history_key if current_app.config.get('CHAT_COALESCING') else None
+        result = bot.answer_question(user_input, batch_key=batch_key)
     elif action == 'check_answer':
         question = data.get('question', '')
         result = bot.check_answer(question, user_input)
     else:
         return jsonify({'error': 'Invalid action'}), 400
     
+    # Prompt vs cached tokens, to keep an eye on the prompt cache hit rate
+    if bot.last_usage:
+        current_app.logger.debug('Groq usage for %s: %s', action, bot.last_usage)
+    
     # Save updated history back to session
     flask_session[history_key] = bot.get_history()
     
     return jsonify(result)
 
+@study_bp.route('/bot/stream/<int:file_id>')
+@login_required
+def bot_stream(file_id):
+    """Stream quiz questions or flashcards as Server-Sent Events while they generate"""
+    action = request.args.get('action', 'quiz')  # 'quiz' or 'flashcards'
+    
+    study_file = StudyFile.query.get(file_id)
+    if not study_file or study_file.user_id != current_user.id:
+        return jsonify({'error': 'File not found'}), 404
+    
+    not_ready = _not_ready_response(study_file)
+    if not_ready:
+        return not_ready
+    
+    # Session cookies are sent before the body, so the new exchange goes out
+    # as a 'memory' event and the client posts it back to /bot/remember
+    history_key = f'bot_history_{current_user.id}_{file_id}'
+    bot = StudyBot(study_file.content, flask_session.get(history_key, []))
+    
+    if action == 'quiz':
+        events = bot.stream_quiz(
+            num_questions=request.args.get('count', 5, type=int),
+            question_type=request.args.get('type', 'mixed')
+        )
+    elif action == 'flashcards':
+        events = bot.stream_flashcards()
+    else:
+        return jsonify({'error': 'Invalid action'}), 400
+    
+    def generate():
+        remembered = len(bot.conversation_history)
+        for event, data in events:
+            if event == 'done' and len(bot.conversation_history) > remembered:
+                memory = bot.conversation_history[remembered:]
+                yield f"event: memory\ndata: {json.dumps(memory)}\n\n"
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@study_bp.route('/bot/remember/<int:file_id>', methods=['POST'])
+@login_required
+def remember_stream(file_id):
+    """Add a streamed exchange (from /bot/stream's 'memory' event) to the bot's memory"""
+    study_file = StudyFile.query.get(file_id)
+    if not study_file or study_file.user_id != current_user.id:
+        return jsonify({'error': 'File not found'}), 404
+    
+    messages = (request.get_json(silent=True) or {}).get('messages')
+    if not isinstance(messages, list) or not all(
+        isinstance(m, dict) and m.get('role') in ('user', 'assistant') and isinstance(m.get('content'), str)
+        for m in messages
+    ):
+        return jsonify({'error': 'Invalid messages'}), 400
+    
+    history_key = f'bot_history_{current_user.id}_{file_id}'
+    history = flask_session.get(history_key, [])
+    history.extend({'role': m['role'], 'content': m['content']} for m in messages)
+    flask_session[history_key] = history
+    
+    return jsonify({'success': True})
+
 @study_bp.route('/bot/clear-memory/<int:file_id>', methods=['POST'])
 @login_required
 def clear_bot_memory(file_id):
@@ -341,6 +587,20 @@ def end_session():
     
     return jsonify({'error': 'Session not found'}), 404
 
+@study_bp.route('/file/<int:file_id>/status')
+@login_required
+def file_status(file_id):
+    """Poll text extraction status for an uploaded file"""
+    study_file = StudyFile.query.get(file_id)
+    
+    if not study_file or study_file.user_id != current_user.id:
+        return jsonify({'error': 'File not found'}), 404
+    
+    if study_file.status == 'processing':
+        _fail_stale_extractions(current_user.id)
+    
+    return jsonify({'file_id': study_file.id, 'status': study_file.status or 'ready'})
+
 @study_bp.route('/file/delete/<int:file_id>', methods=['POST'])
 @login_required
 def delete_file(file_id):
@@ -350,18 +610,12 @@ def delete_file(file_id):
     if not study_file or study_file.user_id != current_user.id:
         return jsonify({'error': 'File not found'}), 404
     
-    # Delete associated chat history
-    BotConversation.query.filter_by(
-        user_id=current_user.id,
-        file_id=file_id
-    ).delete()
-    
     # Clear bot memory for this file
     history_key = f'bot_history_{current_user.id}_{file_id}'
     if history_key in flask_session:
         del flask_session[history_key]
     
-    # Delete the file
+    # Delete the file (chat history cascades via ON DELETE CASCADE)
     db.session.delete(study_file)
     db.session.commit()
     
@@ -2,7 +2,113 @@
 Study Bot Service - Powered by Groq (Free & Fast!) with Memory!
 """
 import os
-from groq import Groq
+import re
+import random
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from groq import Groq, AsyncGroq
+
+MODEL = "llama-3.1-8b-instant"
+
+# Prompt variety (focus hints, seeds); seed it in tests for repeatable prompts
+_RNG = random.Random()
+
+# "Q1: ..." followed by "A1: ...", and "CARD_1_FRONT: ..." followed by "CARD_1_BACK: ...".
+# Labels may be **bold**. Lines between a question and its answer (e.g. MCQ
+# options) belong to the question; lines between a front and back are skipped.
+_QUIZ_RE = re.compile(
+    r'^[ \t*]*Q\d*[ \t]*:[ \t*]*(.+?(?:\n(?![ \t*]*[QA]\d*[ \t]*:).*)*?)[ \t]*'
+    r'\n\s*?[ \t*]*A\d*[ \t]*:[ \t*]*(.+?)[ \t*]*$',
+    re.M
+)
+_CARD_RE = re.compile(
+    r'^[ \t*]*CARD_\d+_FRONT[ \t]*:[ \t*]*(.+?)[ \t*]*'
+    r'\n(?:(?![ \t*]*CARD_\d+_(?:FRONT|BACK)[ \t]*:).*\n)*?[ \t*]*CARD_\d+_BACK[ \t]*:[ \t*]*(.+?)[ \t*]*$',
+    re.M
+)
+# Lowercased question listing (a) ... (b) options, inline or one "a)" per line
+_MCQ_RE = re.compile(r'\(a\).*\(b\)|^a\).*^b\)', re.S | re.M)
+# Sentence (and line) boundaries and capitalised key terms for the local quiz
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|\s*\n\s*')
+_KEY_TERM_RE = re.compile(r'\b[A-Z][a-z]{4,}\b')
+_LIST_MARKER_RE = re.compile(r'^(?:[-*•]|\d+[.)])\s+')
+_LABEL_RE = re.compile(r'^[^.:]{1,40}:\s+')  # "Hash Tables: ..." style lead-ins
+# Capitalised words that aren't worth quizzing on
+_QUIZ_STOP_WORDS = frozenset((
+    'about', 'after', 'also', 'although', 'another', 'average', 'because', 'before',
+    'between', 'chapter', 'common', 'during', 'every', 'example', 'figure', 'first',
+    'however', 'introduction', 'lesson', 'module', 'other', 'section', 'summary',
+    'their', 'there', 'these', 'those', 'through', 'which', 'while',
+))
+# Verdict tags check_answer asks the model to lead with
+_TAG_RE = re.compile(r'\[(?:correct|incorrect|partial)\]', re.I)
+# "ANSWER_1: ..." blocks in a reply to several chat questions at once
+_ANSWER_RE = re.compile(r'^[ \t]*ANSWER_(\d+):[ \t]*(.*?)(?=^[ \t]*ANSWER_\d+:|\Z)', re.M | re.S)
+# Chat messages asking for a quiz, which belongs in the Generate Quiz flow
+_QUIZ_KW_RE = re.compile(
+    'create quiz|make quiz|give me quiz|mcq|multiple choice|'
+    'generate quiz|test me|quiz me|give me questions'
+)
+
+def _stream_matches(chunks, pattern, parts):
+    """Yield pattern matches from streamed text as soon as their lines are complete.
+    
+    Every chunk is also appended to ``parts`` so the caller can rebuild the full reply.
+    """
+    buffer = ''
+    pos = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        buffer += chunk
+        # Only scan up to the last newline so a half-received line never matches
+        for match in pattern.finditer(buffer, pos, buffer.rfind('\n') + 1):
+            pos = match.end()
+            yield match
+    yield from pattern.finditer(buffer, pos)
+
+# Chat questions for the same conversation that arrive within this many
+# seconds of each other are answered with a single Groq request
+ASK_COALESCE_WINDOW = 0.3
+_ask_lock = threading.Lock()
+_pending_asks = {}
+
+def _coalesce_ask(key, question, answer_batch):
+    """Answer question together with any others queued under key in the same window.
+    
+    The first caller waits out the window, then runs answer_batch on every
+    question collected so far; later callers just wait for their answer.
+    """
+    with _ask_lock:
+        batch = _pending_asks.get(key)
+        leader = batch is None
+        if leader:
+            batch = _pending_asks[key] = {'questions': [], 'answers': None, 'done': threading.Event()}
+        index = len(batch['questions'])
+        batch['questions'].append(question)
+    
+    if leader:
+        time.sleep(ASK_COALESCE_WINDOW)
+        with _ask_lock:
+            del _pending_asks[key]
+        try:
+            batch['answers'] = answer_batch(batch['questions'])
+        except Exception as e:
+            batch['answers'] = [f"Oops, something went wrong on my end 😅 Error: {str(e)}"] * len(batch['questions'])
+        finally:
+            batch['done'].set()
+    else:
+        batch['done'].wait()
+    
+    return batch['answers'][index]
+
+# GIF lookups run here so they overlap with the Groq request
+_gif_executor = ThreadPoolExecutor(max_workers=4)
+# Once the verdict is in, wait at most this long (seconds) for its GIF;
+# a slow Giphy call finishes on the executor instead of the request thread
+GIF_WAIT_TIMEOUT = 1
 
 # Initialize Groq client lazily
 _client = None
@@ -10,12 +116,101 @@ _client = None
 def get_client():
     global _client
     if _client is None:
-        api_key = os.environ.get('GROQ_API_KEY')
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        _client = Groq(api_key=api_key)
+        _client = Groq(api_key=_get_api_key())
     return _client
 
+def _get_api_key():
+    api_key = os.environ.get('GROQ_API_KEY')
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable is not set")
+    return api_key
+
+def _usage_stats(response):
+    """Prompt vs cached token counts, to check the prompt cache hit rate"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return None
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        'prompt_tokens': usage.prompt_tokens,
+        'cached_tokens': getattr(details, 'cached_tokens', 0) or 0
+    }
+
+# Pure lookups on a handful of inputs, so cache them
+@lru_cache(maxsize=4)
+def _question_type_instructions(question_type):
+    """Get prompt instructions based on question type configuration."""
+    if question_type == 'multiple_choice':
+        return """QUESTION TYPE: Multiple Choice ONLY
+
+Create ALL questions as Multiple Choice:
+Q: What does [concept] do? (A) first option (B) second option (C) third option (D) fourth option
+A: B
+
+- Put all options on ONE line with (A) (B) (C) (D) format
+- Answer should be just the letter"""
+
+    elif question_type == 'identification':
+        return """QUESTION TYPE: Identification ONLY
+
+Create ALL questions as Identification:
+Q: Identify: [description of a term, person, concept, or thing]
+A: [the term/name being identified]
+
+- Ask students to identify terms, concepts, people, or things based on descriptions
+- Keep answers to 1-3 words"""
+
+    elif question_type == 'true_false':
+        return """QUESTION TYPE: True/False ONLY
+
+Create ALL questions as True/False:
+Q: True or False: [statement about the material]
+A: True (or False)
+
+- Make statements that are clearly true or false based on the material
+- Answer should be just "True" or "False" """
+
+    else:  # mixed
+        return """QUESTION TYPES TO USE (mix these types):
+
+1. Fill-in-the-blank:
+Q1: The _____ is responsible for [function].
+A1: [correct word]
+
+2. Short Answer:
+Q2: What is [concept]?
+A2: [brief 1-3 word answer]
+
+3. True/False:
+Q3: True or False: [statement]
+A3: True (or False)
+
+4. Identification:
+Q4: Identify: [description of a term, person, concept, or thing]
+A4: [the term/name being identified]
+
+5. Multiple Choice (format the answer as just the letter):
+Q5: What does [concept] do? (A) first option (B) second option (C) third option (D) fourth option
+A5: B
+
+Mix different question types for variety!"""
+
+@lru_cache(maxsize=512)
+def _detect_question_type(question):
+    """Detect the type of question based on its content."""
+    question_lower = question.lower()
+
+    if _MCQ_RE.search(question_lower):
+        return 'multiple_choice'
+    elif question_lower.startswith('true or false'):
+        return 'true_false'
+    elif question_lower.startswith(('identify:', 'identify ')):
+        return 'identification'
+    elif '____' in question:
+        return 'fill_in_blank'
+    else:
+        return 'short_answer'
+
 class StudyBot:
     SYSTEM_PROMPT = """You are a friendly, supportive study buddy named Buddy. You help students learn from their study materials.
 
@@ -35,48 +230,122 @@ You have access to the student's study notes. Use them to:
 
 IMPORTANT: When you create quizzes or ask questions, remember them! When the student answers, evaluate their response based on the questions you asked."""
 
+    # Approximate token budget for conversation history sent with each request
+    MAX_HISTORY_TOKENS = 1500
+    # Identification quizzes for notes shorter than this are built locally
+    LOCAL_QUIZ_MAX_CHARS = 2000
+
     def __init__(self, content, conversation_history=None):
         self.content = content
         self.conversation_history = conversation_history or []
+        # Limit content size for faster responses. Computed once so the
+        # prompt prefix is byte-identical across calls (Groq prompt caching).
+        self._content_preview = content[:4000]
+        self._static_prefix = (
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "system", "content": f"Study notes:\n{self._content_preview}"},
+        )
+        self.last_usage = None
+    
+    def _build_messages(self, user_message, task_context=""):
+        """Build the request messages for a chat turn"""
+        # Stable prefix first, volatile content last, so the cached
+        # prefix (system prompt + notes + history) keeps getting hit
+        messages = list(self._static_prefix)
+        
+        # Add conversation history for context (token-budgeted, keeps the last quiz)
+        for msg in self._recent_history():
+            messages.append({"role": msg['role'], "content": msg['content']})
+        
+        # Task instructions ride along with the current message
+        if task_context:
+            messages.append({"role": "user", "content": f"{task_context}\n\n{user_message}"})
+        else:
+            messages.append({"role": "user", "content": user_message})
+        
+        return messages
+    
+    def _handle_response(self, user_message, response, remember=True):
+        """Record a completed exchange and return the bot's reply"""
+        bot_response = response.choices[0].message.content
+        self.last_usage = _usage_stats(response)
+        if remember:
+            self._remember(user_message, bot_response)
+        return bot_response
     
-    def _chat(self, user_message, task_context=""):
+    def _remember(self, user_message, bot_response):
+        """Update conversation history"""
+        self.conversation_history.append({"role": "user", "content": user_message})
+        self.conversation_history.append({"role": "assistant", "content": bot_response})
+    
+    def _chat(self, user_message, task_context="", remember=True):
         """Send a message to Groq with conversation history"""
         try:
-            # Limit content size for faster responses
-            content_preview = self.content[:4000] if len(self.content) > 4000 else self.content
-            
-            messages = [
-                {"role": "system", "content": self.SYSTEM_PROMPT},
-                {"role": "system", "content": f"Study notes:\n{content_preview}"},
-            ]
-            
-            if task_context:
-                messages.append({"role": "system", "content": task_context})
-            
-            # Add conversation history for context (last 10 messages to remember quizzes)
-            for msg in self.conversation_history[-10:]:
-                messages.append({"role": msg['role'], "content": msg['content']})
-            
-            # Add current message
-            messages.append({"role": "user", "content": user_message})
-            
             response = get_client().chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=messages,
+                model=MODEL,
+                messages=self._build_messages(user_message, task_context),
                 max_tokens=800,
                 temperature=0.7
             )
-            
-            bot_response = response.choices[0].message.content
-            
-            # Update conversation history
-            self.conversation_history.append({"role": "user", "content": user_message})
-            self.conversation_history.append({"role": "assistant", "content": bot_response})
-            
-            return bot_response
+            return self._handle_response(user_message, response, remember)
         except Exception as e:
             return f"Oops, something went wrong on my end 😅 Error: {str(e)}"
     
+    async def _achat(self, client, user_message, task_context=""):
+        """Async version of _chat, so several requests can run concurrently"""
+        try:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=self._build_messages(user_message, task_context),
+                max_tokens=800,
+                temperature=0.7
+            )
+            return self._handle_response(user_message, response)
+        except Exception as e:
+            return f"Oops, something went wrong on my end 😅 Error: {str(e)}"
+    
+    def _chat_stream(self, user_message, task_context=""):
+        """Like _chat, but yields the reply piece by piece as Groq generates it"""
+        stream = get_client().chat.completions.create(
+            model=MODEL,
+            messages=self._build_messages(user_message, task_context),
+            max_tokens=800,
+            temperature=0.7,
+            stream=True
+        )
+        
+        parts = []
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        
+        self._remember(user_message, ''.join(parts))
+    
+    def _recent_history(self):
+        """Newest messages that fit in MAX_HISTORY_TOKENS (roughly 4 chars per token).
+        
+        The most recent quiz is always kept, even when it falls outside the
+        window, so answers can still be checked against it.
+        """
+        budget = self.MAX_HISTORY_TOKENS
+        start = len(self.conversation_history)
+        for msg in reversed(self.conversation_history):
+            cost = len(msg['content']) // 4
+            if cost > budget:
+                break
+            budget -= cost
+            start -= 1
+        
+        window = self.conversation_history[start:]
+        for index in range(len(self.conversation_history) - 1, -1, -1):
+            msg = self.conversation_history[index]
+            if msg['role'] == 'assistant' and 'QUIZ_START' in msg['content']:
+                # Only pin the newest quiz, and only if the window dropped it
+                return [msg] + window if index < start else window
+        return window
+    
     def get_history(self):
         """Return current conversation history"""
         return self.conversation_history
@@ -85,6 +354,11 @@ IMPORTANT: When you create quizzes or ask questions, remember them! When the stu
     VALID_QUESTION_COUNTS = [5, 10, 15, 20]
     VALID_QUESTION_TYPES = ['multiple_choice', 'identification', 'true_false', 'mixed']
     
+    NOT_ENOUGH_CONTENT = {
+        'type': 'error',
+        'message': "Not enough content to generate a quiz. Please upload more study material."
+    }
+    
     def generate_quiz(self, num_questions=5, question_type='mixed'):
         """Generate a quiz from the content using AI with configurable parameters.
         
@@ -95,21 +369,31 @@ IMPORTANT: When you create quizzes or ask questions, remember them! When the stu
         Returns:
             dict: Quiz data with questions or error message
         """
-        import random
+        num_questions, question_type = self._normalize_quiz_config(num_questions, question_type)
         
-        # Validate and normalize parameters
+        # Check if content is sufficient (at least 100 characters)
+        if len(self.content.strip()) < 100:
+            return dict(self.NOT_ENOUGH_CONTENT)
+        
+        # Short notes can be turned into identification questions locally
+        if question_type == 'identification' and len(self.content) < self.LOCAL_QUIZ_MAX_CHARS:
+            quiz = self._local_quiz(num_questions)
+            if quiz:
+                return quiz
+        
+        response = self._chat(self._quiz_prompt(num_questions, question_type))
+        return self._parse_quiz(response, num_questions, question_type)
+    
+    def _normalize_quiz_config(self, num_questions, question_type):
+        """Fall back to defaults for unsupported quiz settings"""
         if num_questions not in self.VALID_QUESTION_COUNTS:
             num_questions = 5  # Default to 5 if invalid
         if question_type not in self.VALID_QUESTION_TYPES:
             question_type = 'mixed'  # Default to mixed if invalid
-        
-        # Check if content is sufficient (at least 100 characters)
-        if len(self.content.strip()) < 100:
-            return {
-                'type': 'error',
-                'message': "Not enough content to generate a quiz. Please upload more study material."
-            }
-        
+        return num_questions, question_type
+    
+    def _quiz_prompt(self, num_questions, question_type):
+        """Build the quiz generation prompt"""
         focus_hints = [
             "Focus on key concepts and definitions.",
             "Ask about details that are often overlooked.",
@@ -118,13 +402,13 @@ IMPORTANT: When you create quizzes or ask questions, remember them! When the stu
             "Ask about relationships between concepts.",
             "Cover different sections of the material."
         ]
-        random_focus = random.choice(focus_hints)
-        random_seed = random.randint(1000, 9999)
+        random_focus = _RNG.choice(focus_hints)
+        random_seed = _RNG.randint(1000, 9999)
         
         # Build question type instructions based on configuration
-        type_instructions = self._get_question_type_instructions(question_type)
+        type_instructions = _question_type_instructions(question_type)
         
-        prompt = f"""Create exactly {num_questions} NEW and UNIQUE questions based on the study notes. (Seed: {random_seed})
+        return f"""Create exactly {num_questions} NEW and UNIQUE questions based on the study notes. (Seed: {random_seed})
 
 {random_focus}
 
@@ -143,28 +427,108 @@ IMPORTANT:
 - Keep ALL answers SHORT (1-3 words max, or just a letter for MCQ)
 - For MCQ, put all options on ONE line with (A) (B) (C) (D) format
 - Generate DIFFERENT questions than any previous quiz!"""
-
-        response = self._chat(prompt)
+    
+    def stream_quiz(self, num_questions=5, question_type='mixed'):
+        """Generate a quiz, yielding each question as soon as it has streamed in.
+        
+        Yields ('question', question) events, then a single ('done', quiz)
+        event holding the same result generate_quiz would have returned.
+        """
+        num_questions, question_type = self._normalize_quiz_config(num_questions, question_type)
+        
+        if len(self.content.strip()) < 100:
+            yield 'done', dict(self.NOT_ENOUGH_CONTENT)
+            return
+        
+        if question_type == 'identification' and len(self.content) < self.LOCAL_QUIZ_MAX_CHARS:
+            quiz = self._local_quiz(num_questions)
+            if quiz:
+                for question in quiz['questions']:
+                    yield 'question', question
+                yield 'done', quiz
+                return
         
-        # Parse the quiz response
-        questions = []
+        parts = []
         try:
-            lines = response.split('\n')
-            current_q = None
-            for line in lines:
-                line = line.strip()
-                if line.startswith('Q') and ':' in line:
-                    current_q = line.split(':', 1)[1].strip()
-                elif line.startswith('A') and ':' in line and current_q:
-                    answer = line.split(':', 1)[1].strip()
-                    questions.append({
-                        'question': current_q,
-                        'answer': answer,
-                        'type': self._detect_question_type(current_q)
-                    })
-                    current_q = None
-        except:
-            pass
+            prompt = self._quiz_prompt(num_questions, question_type)
+            for match in _stream_matches(self._chat_stream(prompt), _QUIZ_RE, parts):
+                yield 'question', self._quiz_item(*match.groups())
+        except Exception as e:
+            parts = [f"Oops, something went wrong on my end 😅 Error: {str(e)}"]
+        
+        yield 'done', self._parse_quiz(''.join(parts), num_questions, question_type)
+    
+    def _local_quiz(self, num_questions):
+        """Build an identification quiz by blanking out key terms in the notes.
+        
+        The quiz is recorded in the conversation history in the same
+        QUIZ_START format the LLM uses. Returns None when the notes don't
+        yield enough questions, so the caller can fall back to the LLM.
+        """
+        candidates = []
+        seen = set()
+        for sentence in _SENTENCE_SPLIT_RE.split(self.content):
+            sentence = _LIST_MARKER_RE.sub('', ' '.join(sentence.split()))
+            # Headings and other fragments don't end like sentences
+            if not 30 <= len(sentence) <= 300 or not sentence.endswith(('.', '!', '?')):
+                continue
+            # Skip any "Label:" lead-in, and the sentence's first word, which is
+            # capitalised because of where it sits rather than being a key term
+            label = _LABEL_RE.match(sentence)
+            body = label.end() if label else 0
+            terms = [
+                match.group() for match in _KEY_TERM_RE.finditer(sentence, body)
+                if match.start() != body and match.group().lower() not in _QUIZ_STOP_WORDS
+            ]
+            if not terms:
+                continue
+            term = max(terms, key=len)
+            if term.lower() in seen:
+                continue
+            seen.add(term.lower())
+            masked = re.sub(rf'\b{term}\b', '_____', sentence)
+            candidates.append((len(term), f"Identify: {masked}", term))
+        
+        if len(candidates) < num_questions:
+            return None
+        
+        # Prefer the most distinctive terms, but vary the pick between quizzes
+        candidates.sort(reverse=True)
+        picked = _RNG.sample(candidates[:num_questions * 2], num_questions)
+        questions = [
+            {'question': question, 'answer': answer, 'type': 'identification'}
+            for _, question, answer in picked
+        ]
+        
+        # Remember it like an LLM quiz, so answers and later quizzes can see it
+        lines = '\n'.join(
+            f"Q{i}: {q['question']}\nA{i}: {q['answer']}" for i, q in enumerate(questions, 1)
+        )
+        self._remember(
+            f"Create a {num_questions}-question identification quiz from my notes.",
+            f"QUIZ_START\n{lines}\nQUIZ_END"
+        )
+        return {
+            'type': 'quiz',
+            'greeting': "Alright, quiz time! Let's see what you've learned 💪",
+            'questions': questions,
+            'total': num_questions,
+            'requested_count': num_questions,
+            'question_type': 'identification'
+        }
+    
+    def _quiz_item(self, question, answer):
+        """Build one parsed quiz question"""
+        question = '\n'.join(line.strip() for line in question.splitlines() if line.strip())
+        return {
+            'question': question,
+            'answer': answer.strip(),
+            'type': _detect_question_type(question)
+        }
+    
+    def _parse_quiz(self, response, num_questions, question_type):
+        """Parse a QUIZ_START/QUIZ_END response into quiz data"""
+        questions = [self._quiz_item(question, answer) for question, answer in _QUIZ_RE.findall(response)]
         
         if not questions:
             # Fallback if parsing failed
@@ -188,78 +552,6 @@ IMPORTANT:
             'question_type': question_type
         }
     
-    def _get_question_type_instructions(self, question_type):
-        """Get prompt instructions based on question type configuration."""
-        if question_type == 'multiple_choice':
-            return """QUESTION TYPE: Multiple Choice ONLY
-
-Create ALL questions as Multiple Choice:
-Q: What does [concept] do? (A) first option (B) second option (C) third option (D) fourth option
-A: B
-
-- Put all options on ONE line with (A) (B) (C) (D) format
-- Answer should be just the letter"""
-        
-        elif question_type == 'identification':
-            return """QUESTION TYPE: Identification ONLY
-
-Create ALL questions as Identification:
-Q: Identify: [description of a term, person, concept, or thing]
-A: [the term/name being identified]
-
-- Ask students to identify terms, concepts, people, or things based on descriptions
-- Keep answers to 1-3 words"""
-        
-        elif question_type == 'true_false':
-            return """QUESTION TYPE: True/False ONLY
-
-Create ALL questions as True/False:
-Q: True or False: [statement about the material]
-A: True (or False)
-
-- Make statements that are clearly true or false based on the material
-- Answer should be just "True" or "False" """
-        
-        else:  # mixed
-            return """QUESTION TYPES TO USE (mix these types):
-
-1. Fill-in-the-blank:
-Q1: The _____ is responsible for [function].
-A1: [correct word]
-
-2. Short Answer:
-Q2: What is [concept]?
-A2: [brief 1-3 word answer]
-
-3. True/False:
-Q3: True or False: [statement]
-A3: True (or False)
-
-4. Identification:
-Q4: Identify: [description of a term, person, concept, or thing]
-A4: [the term/name being identified]
-
-5. Multiple Choice (format the answer as just the letter):
-Q5: What does [concept] do? (A) first option (B) second option (C) third option (D) fourth option
-A5: B
-
-Mix different question types for variety!"""
-    
-    def _detect_question_type(self, question):
-        """Detect the type of question based on its content."""
-        question_lower = question.lower()
-        
-        if '(a)' in question_lower and '(b)' in question_lower:
-            return 'multiple_choice'
-        elif question_lower.startswith('true or false'):
-            return 'true_false'
-        elif question_lower.startswith('identify:') or question_lower.startswith('identify '):
-            return 'identification'
-        elif '_____' in question or '____' in question:
-            return 'fill_in_blank'
-        else:
-            return 'short_answer'
-    
     def ask_question(self):
         """Generate a question for the user to answer"""
         prompt = """Ask the student ONE thought-provoking question about their study material. 
@@ -275,15 +567,21 @@ Don't give the answer - just ask the question and wait for their response."""
             'context': ''
         }
     
-    def answer_question(self, user_question):
-        """Answer a user's question or evaluate their quiz answer"""
+    ASK_TASK_CONTEXT = """Answer the student's question based on the study notes. 
+DO NOT create quizzes or MCQs in chat - just answer their question directly.
+If they ask for a quiz, tell them to use the Generate Quiz button."""
+    
+    def answer_question(self, user_question, batch_key=None):
+        """Answer a user's question or evaluate their quiz answer.
+        
+        With a batch_key (one per conversation), questions sent in quick
+        succession are answered together in one Groq request.
+        """
         
         user_lower = user_question.lower().strip()
         
         # Check if user is asking for a quiz/MCQ in chat
-        quiz_keywords = ['create quiz', 'make quiz', 'give me quiz', 'mcq', 'multiple choice', 
-                        'generate quiz', 'test me', 'quiz me', 'give me questions']
-        if any(kw in user_lower for kw in quiz_keywords):
+        if _QUIZ_KW_RE.search(user_lower):
             return {
                 'type': 'answer',
                 'response': "For quizzes, click the **Generate Quiz** button above! 👆 It'll create a proper quiz with answer checking. In chat, I'm better at explaining concepts and answering your questions about the material! 📚",
@@ -291,11 +589,11 @@ Don't give the answer - just ask the question and wait for their response."""
             }
         
         # Regular Q&A - tell the bot NOT to create quizzes
-        task_context = """Answer the student's question based on the study notes. 
-DO NOT create quizzes or MCQs in chat - just answer their question directly.
-If they ask for a quiz, tell them to use the Generate Quiz button."""
-        
-        response = self._chat(user_question, task_context)
+        if batch_key is None:
+            response = self._chat(user_question, self.ASK_TASK_CONTEXT)
+        else:
+            response = _coalesce_ask(batch_key, user_question, self._answer_batch)
+            self._remember(user_question, response)
         
         return {
             'type': 'answer',
@@ -303,12 +601,35 @@ If they ask for a quiz, tell them to use the Generate Quiz button."""
             'confidence': 'high'
         }
     
+    def _answer_batch(self, questions):
+        """Answer several chat questions with one request, one reply per question"""
+        if len(questions) == 1:
+            return [self._chat(questions[0], self.ASK_TASK_CONTEXT, remember=False)]
+        
+        numbered = '\n'.join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+        prompt = f"""Answer these questions separately:
+{numbered}
+
+Start each answer on its own line with ANSWER_<number>: matching the question number."""
+        response = self._chat(prompt, self.ASK_TASK_CONTEXT, remember=False)
+        
+        answers = {int(number): answer.strip() for number, answer in _ANSWER_RE.findall(response)}
+        # Any question the reply couldn't be split for is answered on its own
+        return [
+            answers.get(i) or self._chat(question, self.ASK_TASK_CONTEXT, remember=False)
+            for i, question in enumerate(questions, 1)
+        ]
+    
     def generate_flashcards(self, num_cards=8):
         """Generate flashcards from the content"""
-        import random
-        random_seed = random.randint(1000, 9999)
+        response = self._chat(self._flashcards_prompt(num_cards))
+        return self._parse_flashcards(response)
+    
+    def _flashcards_prompt(self, num_cards):
+        """Build the flashcard generation prompt"""
+        random_seed = _RNG.randint(1000, 9999)
         
-        prompt = f"""Create exactly {num_cards} flashcards from the study notes. (Seed: {random_seed})
+        return f"""Create exactly {num_cards} flashcards from the study notes. (Seed: {random_seed})
 
 Each flashcard should have:
 - FRONT: A term, concept, question, or prompt (keep it short!)
@@ -330,27 +651,27 @@ CARD_2_BACK: [back text]
 FLASHCARDS_END
 
 Keep fronts SHORT (1-10 words). Backs can be longer but still concise."""
-
-        response = self._chat(prompt)
-        
-        # Parse flashcards
-        cards = []
+    
+    def stream_flashcards(self, num_cards=8):
+        """Generate flashcards, yielding ('card', card) events as they stream in
+        and a final ('done', flashcards) event like generate_flashcards returns."""
+        parts = []
         try:
-            lines = response.split('\n')
-            current_front = None
-            for line in lines:
-                line = line.strip()
-                if '_FRONT:' in line:
-                    current_front = line.split(':', 1)[1].strip()
-                elif '_BACK:' in line and current_front:
-                    back = line.split(':', 1)[1].strip()
-                    cards.append({
-                        'front': current_front,
-                        'back': back
-                    })
-                    current_front = None
-        except:
-            pass
+            prompt = self._flashcards_prompt(num_cards)
+            for match in _stream_matches(self._chat_stream(prompt), _CARD_RE, parts):
+                front, back = match.groups()
+                yield 'card', {'front': front.strip(), 'back': back.strip()}
+        except Exception:
+            parts = []
+        
+        yield 'done', self._parse_flashcards(''.join(parts))
+    
+    def _parse_flashcards(self, response):
+        """Parse a FLASHCARDS_START/FLASHCARDS_END response into flashcard data"""
+        cards = [
+            {'front': front.strip(), 'back': back.strip()}
+            for front, back in _CARD_RE.findall(response)
+        ]
         
         if not cards:
             return {
@@ -364,6 +685,34 @@ Keep fronts SHORT (1-10 words). Backs can be longer but still concise."""
             'total': len(cards)
         }
     
+    async def generate_study_pack(self, num_questions=5, question_type='mixed', num_cards=8):
+        """Generate a quiz and flashcards with two concurrent Groq requests.
+        
+        Returns:
+            dict: Quiz and flashcard data, or the quiz error if content is too short
+        """
+        num_questions, question_type = self._normalize_quiz_config(num_questions, question_type)
+        
+        if len(self.content.strip()) < 100:
+            return dict(self.NOT_ENOUGH_CONTENT)
+        
+        # The async client is scoped to this event loop; a shared one would
+        # outlive the loop that asyncio.run() creates per request
+        try:
+            async with AsyncGroq(api_key=_get_api_key()) as client:
+                quiz_response, cards_response = await asyncio.gather(
+                    self._achat(client, self._quiz_prompt(num_questions, question_type)),
+                    self._achat(client, self._flashcards_prompt(num_cards))
+                )
+        except Exception as e:
+            quiz_response = cards_response = f"Oops, something went wrong on my end 😅 Error: {str(e)}"
+        
+        return {
+            'type': 'study_pack',
+            'quiz': self._parse_quiz(quiz_response, num_questions, question_type),
+            'flashcards': self._parse_flashcards(cards_response)
+        }
+    
     def check_answer(self, question, user_answer):
         """Check if user's answer is correct - now with context and GIFs!"""
         prompt = f"""The student's answer: {user_answer}
@@ -376,30 +725,34 @@ IMPORTANT: Start your response with either [CORRECT] or [INCORRECT] or [PARTIAL]
 - If partially correct: Start with [PARTIAL] then acknowledge what they got right and what needs work
 - If wrong: Start with [INCORRECT] then be supportive and explain the right answer"""
 
+        # Fetch both possible GIFs while Groq evaluates the answer
+        gif_futures = {}
+        try:
+            from services.giphy import get_correct_answer_gif, get_wrong_answer_gif
+            gif_futures[True] = _gif_executor.submit(get_correct_answer_gif)
+            gif_futures[False] = _gif_executor.submit(get_wrong_answer_gif)
+        except:
+            pass
+        
         response = self._chat(prompt)
         
         # Check the tag at the start of response
-        response_lower = response.lower()
-        if '[correct]' in response_lower and '[incorrect]' not in response_lower:
+        tags = {tag.lower() for tag in _TAG_RE.findall(response)}
+        if '[correct]' in tags and '[incorrect]' not in tags:
             is_correct = True
-        elif '[partial]' in response_lower:
+        elif '[partial]' in tags:
             is_correct = True  # Give credit for partial
         else:
             is_correct = False
         
         # Clean up the tag from the displayed response
-        clean_response = response
-        for tag in ['[CORRECT]', '[INCORRECT]', '[PARTIAL]', '[correct]', '[incorrect]', '[partial]']:
-            clean_response = clean_response.replace(tag, '').strip()
+        clean_response = _TAG_RE.sub('', response).strip()
         
-        # Get a relevant GIF
+        # Use the GIF that matches the verdict and drop the other one
         gif = None
         try:
-            from services.giphy import get_correct_answer_gif, get_wrong_answer_gif
-            if is_correct:
-                gif = get_correct_answer_gif()
-            else:
-                gif = get_wrong_answer_gif()
+            gif_futures.pop(not is_correct).cancel()
+            gif = gif_futures[is_correct].result(timeout=GIF_WAIT_TIMEOUT)
         except:
             pass
         
@@ -2,34 +2,82 @@
 Giphy Service - Fetch study-related GIFs and memes
 """
 import os
+import time
 import random
 import requests
+from requests.adapters import HTTPAdapter
 
 GIPHY_API_KEY = os.environ.get('GIPHY_API_KEY')
 GIPHY_SEARCH_URL = "https://api.giphy.com/v1/gifs/search"
 GIPHY_RANDOM_URL = "https://api.giphy.com/v1/gifs/random"
 
+# Shared session so GIF lookups reuse kept-alive connections instead of
+# doing a fresh TCP + TLS handshake per call
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Search results are cached per term; we only rotate through a few dozen terms
+GIF_CACHE_TTL = 60 * 60  # seconds
+GIF_CACHE_MAX_TERMS = 256
+_GIF_CACHE = {}  # (search_term, rating) -> (fetched_at, results)
+
 # Study-related search terms for variety
-STUDY_TERMS = [
+STUDY_TERMS = (
     "studying hard", "brain power", "you got this", "smart", "learning",
     "focus", "motivation", "success", "thinking", "eureka", "genius",
     "proud", "celebrate", "high five", "good job", "nailed it"
-]
+)
 
-CORRECT_ANSWER_TERMS = [
+CORRECT_ANSWER_TERMS = (
     "celebration", "you got this", "proud", "success", "winner",
     "high five", "good job", "nailed it", "smart", "genius"
-]
+)
 
-WRONG_ANSWER_TERMS = [
+WRONG_ANSWER_TERMS = (
     "its okay", "try again", "you can do it", "dont give up",
     "keep going", "almost", "next time", "learning"
-]
+)
 
-BREAK_TIME_TERMS = [
+BREAK_TIME_TERMS = (
     "relax", "take a break", "chill", "rest", "coffee break",
     "stretch", "breathe", "calm"
-]
+)
+
+
+def _search_gifs(search_term, rating):
+    """Giphy search results for a term, cached for GIF_CACHE_TTL seconds"""
+    key = (search_term, rating)
+    cached = _GIF_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < GIF_CACHE_TTL:
+        return cached[1]
+    
+    params = {
+        "api_key": GIPHY_API_KEY,
+        "q": search_term,
+        "limit": 25,
+        "rating": rating,
+        "lang": "en"
+    }
+    
+    response = _SESSION.get(GIPHY_SEARCH_URL, params=params, timeout=5)
+    # Keep only the fields we hand out - raw Giphy entries are large
+    results = [
+        {
+            "url": gif["images"]["fixed_height"]["url"],
+            "title": gif.get("title", ""),
+            "width": gif["images"]["fixed_height"]["width"],
+            "height": gif["images"]["fixed_height"]["height"]
+        }
+        for gif in response.json().get("data") or []
+    ]
+    
+    if results:
+        _GIF_CACHE.pop(key, None)
+        if len(_GIF_CACHE) >= GIF_CACHE_MAX_TERMS:
+            # Evict the oldest entry (dicts keep insertion order)
+            _GIF_CACHE.pop(next(iter(_GIF_CACHE)), None)
+        _GIF_CACHE[key] = (time.monotonic(), results)
+    return results
 
 
 def get_gif(search_term=None, rating="pg"):
@@ -50,26 +98,11 @@ def get_gif(search_term=None, rating="pg"):
         if search_term is None:
             search_term = random.choice(STUDY_TERMS)
         
-        params = {
-            "api_key": GIPHY_API_KEY,
-            "q": search_term,
-            "limit": 25,
-            "rating": rating,
-            "lang": "en"
-        }
-        
-        response = requests.get(GIPHY_SEARCH_URL, params=params, timeout=5)
-        data = response.json()
+        results = _search_gifs(search_term, rating)
         
-        if data.get("data"):
+        if results:
             # Pick a random GIF from results
-            gif = random.choice(data["data"])
-            return {
-                "url": gif["images"]["fixed_height"]["url"],
-                "title": gif.get("title", ""),
-                "width": gif["images"]["fixed_height"]["width"],
-                "height": gif["images"]["fixed_height"]["height"]
-            }
+            return dict(random.choice(results))
     except Exception as e:
         print(f"Giphy error: {e}")
     
@@ -105,3 +138,12 @@ def get_topic_gif(topic):
     # Add 'funny' or 'meme' to make it more entertaining
     search_term = f"{topic} funny"
     return get_gif(search_term)
+
+
+if not GIPHY_API_KEY:
+    # GIFs are disabled without a key: skip the term pick and the call entirely
+    def _no_gif(*args, **kwargs):
+        return None
+    
+    get_gif = get_correct_answer_gif = get_wrong_answer_gif = _no_gif
+    get_motivation_gif = get_break_gif = get_topic_gif = _no_gif
@@ -2,10 +2,14 @@
 Motivation Service - Daily tips, memes, encouragement
 """
 import random
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
 class MotivationEngine:
-    TIPS = [
+    # Read-only content tables
+    TIPS = (
         "Try the Pomodoro Technique: 25 minutes of focus, then a 5-minute break! 🍅",
         "Teaching someone else is the best way to learn. Explain concepts out loud! 🗣️",
         "Stay hydrated! Your brain works better when you drink enough water. 💧",
@@ -16,9 +20,9 @@ class MotivationEngine:
         "Create mind maps to visualize connections between concepts. 🗺️",
         "Study in different locations to improve memory recall. 📍",
         "Reward yourself after completing study goals! 🎁"
-    ]
+    )
     
-    MEMES = [
+    MEMES = (
         {
             'text': "Me: I'll study for 5 minutes.\n*3 hours later*\nStill on the same page 😅",
             'mood': 'relatable'
@@ -43,9 +47,9 @@ class MotivationEngine:
             'text': "My brain during class: 💤\nMy brain at 2am: What if aliens use Reddit? 👽",
             'mood': 'random'
         }
-    ]
+    )
     
-    ENCOURAGEMENTS = {
+    ENCOURAGEMENTS = MappingProxyType({
         'streak_1': "You started! That's the hardest part. Keep it up! 🌱",
         'streak_3': "3 days strong! You're building momentum! 🚀",
         'streak_7': "A WHOLE WEEK! You're officially a study machine! 🤖",
@@ -55,7 +59,18 @@ class MotivationEngine:
         'perfect_score': "PERFECT SCORE! You absolutely crushed it! 🎯",
         'improvement': "Your scores are improving! Hard work pays off! 📈",
         'comeback': "Welcome back! Ready to pick up where you left off? 🔄"
-    }
+    })
+    
+    # Streak milestones (ascending) and the encouragement each one unlocks
+    _STREAK_THRESHOLDS = (1, 3, 7, 14, 30)
+    _STREAK_KEYS = ('streak_1', 'streak_3', 'streak_7', 'streak_14', 'streak_30')
+    _STREAK_MSGS = tuple(map(ENCOURAGEMENTS.__getitem__, _STREAK_KEYS))
+    
+    # Own RNG for tip/meme picks, indexing by the precomputed list sizes
+    _rng = random.Random()
+    _randrange = staticmethod(_rng.randrange)
+    _N_TIPS = len(TIPS)
+    _N_MEMES = len(MEMES)
     
     @classmethod
     def get_daily_motivation(cls, user_stats):
@@ -64,41 +79,40 @@ class MotivationEngine:
         total_sessions = user_stats.get('total_sessions', 0)
         last_accuracy = user_stats.get('last_accuracy', 0)
         
-        # Determine the best encouragement
-        if streak >= 30:
-            encouragement = cls.ENCOURAGEMENTS['streak_30']
-        elif streak >= 14:
-            encouragement = cls.ENCOURAGEMENTS['streak_14']
-        elif streak >= 7:
-            encouragement = cls.ENCOURAGEMENTS['streak_7']
-        elif streak >= 3:
-            encouragement = cls.ENCOURAGEMENTS['streak_3']
-        elif streak >= 1:
-            encouragement = cls.ENCOURAGEMENTS['streak_1']
-        elif total_sessions > 0:
-            encouragement = cls.ENCOURAGEMENTS['comeback']
-        else:
-            encouragement = "Welcome! Ready to start your learning journey? 🎉"
+        # Determine the best encouragement: highest streak milestone reached
+        tier = bisect_right(cls._STREAK_THRESHOLDS, streak) - 1
         
         return {
-            'encouragement': encouragement,
-            'tip': random.choice(cls.TIPS),
-            'meme': random.choice(cls.MEMES)
+            'encouragement': cls._encouragement_for(tier, total_sessions > 0),
+            'tip': cls.TIPS[cls._randrange(cls._N_TIPS)],
+            'meme': cls.MEMES[cls._randrange(cls._N_MEMES)]
         }
     
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _encouragement_for(cls, tier, has_sessions):
+        """Encouragement for a streak tier (-1 means no milestone reached yet)"""
+        if tier >= 0:
+            return cls._STREAK_MSGS[tier]
+        elif has_sessions:
+            return cls.ENCOURAGEMENTS['comeback']
+        else:
+            return "Welcome! Ready to start your learning journey? 🎉"
+    
     @classmethod
     def get_session_feedback(cls, questions_answered, correct_answers):
         """Get feedback after a study session"""
         if questions_answered == 0:
             return "Good reading session! Try some quizzes next time to test yourself! 📚"
         
-        accuracy = (correct_answers / questions_answered) * 100
+        # Whole percent, rounded down, so a near-miss never shows as 100%
+        accuracy = correct_answers * 100 // questions_answered
         
-        if accuracy == 100:
+        if correct_answers == questions_answered:
             return cls.ENCOURAGEMENTS['perfect_score']
         elif accuracy >= 80:
-            return f"Excellent! {accuracy:.0f}% accuracy! You really know this material! 🌟"
+            return f"Excellent! {accuracy}% accuracy! You really know this material! 🌟"
         elif accuracy >= 60:
-            return f"Good job! {accuracy:.0f}% accuracy. Keep practicing! 💪"
+            return f"Good job! {accuracy}% accuracy. Keep practicing! 💪"
         else:
-            return f"{accuracy:.0f}% - Don't worry! Every mistake is a learning opportunity! 📖"
+            return f"{accuracy}% - Don't worry! Every mistake is a learning opportunity! 📖"
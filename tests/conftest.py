@@ -0,0 +1,137 @@
+"""
+Shared pytest configuration and fixtures
+"""
+import asyncio
+import os
+import pytest
+from types import SimpleNamespace
+from hypothesis import settings
+from hypothesis.database import DirectoryBasedExampleDatabase
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Route tests use a throwaway in-memory database, never the developer's one.
+# Set before anything imports app, which reads it at import time.
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+# Hypothesis' built-in CI profile (active when CI is set) turns the example
+# database off. Keep it on, so a CI cache of .hypothesis/examples replays
+# earlier failing and shrunk examples first.
+settings.register_profile(
+    "ci",
+    settings.get_profile("ci"),
+    database=DirectoryBasedExampleDatabase(os.path.join(ROOT_DIR, ".hypothesis", "examples")),
+)
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Test client logged in as a user with one subject, on a fresh database"""
+    from app import app
+    from models import db, User, Subject
+
+    app.config.update(TESTING=True, UPLOAD_FOLDER=str(tmp_path),
+                      BACKGROUND_EXTRACTION=False, CHAT_COALESCING=False)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='tester', email='tester@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        subject = Subject(user_id=user.id, name='Science')
+        db.session.add(subject)
+        db.session.commit()
+        user_id, subject_id = user.id, subject.id
+
+    test_client = app.test_client()
+    with test_client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    test_client.user_id = user_id
+    test_client.subject_id = subject_id
+    yield test_client
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def _stream_chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class FakeGroq:
+    """Stands in for the Groq client (and, called like a class, for AsyncGroq).
+
+    Replies are popped in order, one per request, or come from a function of
+    the prompt if that's the only reply given. Streamed requests get the reply
+    in chunk_size pieces, and error (if set) is raised instead of replying.
+    Every prompt is recorded, and so is the peak number of async requests in flight.
+    """
+    def __init__(self, *replies, chunk_size=7, error=None):
+        self.reply_for = replies[0] if len(replies) == 1 and callable(replies[0]) else None
+        self.replies = list(replies)
+        self.chunk_size = chunk_size
+        self.error = error
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __call__(self, api_key=None):
+        return _FakeAsyncGroq(self)
+
+    def reply(self, messages):
+        if self.error:
+            raise self.error
+        prompt = messages[-1]['content']
+        self.prompts.append(prompt)
+        return self.reply_for(prompt) if self.reply_for else self.replies.pop(0)
+
+    def _create(self, messages, stream=False, **kwargs):
+        reply = self.reply(messages)
+        if not stream:
+            return _completion(reply)
+        return (_stream_chunk(reply[i:i + self.chunk_size]) for i in range(0, len(reply), self.chunk_size))
+
+
+class _FakeAsyncGroq:
+    """The AsyncGroq side of a FakeGroq, sharing its replies and records"""
+    def __init__(self, fake):
+        self.fake = fake
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def _create(self, messages, **kwargs):
+        fake = self.fake
+        fake.in_flight += 1
+        fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+        try:
+            await asyncio.sleep(0.01)  # Let concurrent requests overlap
+            return _completion(fake.reply(messages))
+        finally:
+            fake.in_flight -= 1
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    """Install a FakeGroq as the bot's Groq and AsyncGroq client; call it with the replies"""
+    import services.bot as bot_module
+
+    def install(*replies, **options):
+        fake = FakeGroq(*replies, **options)
+        monkeypatch.setenv('GROQ_API_KEY', 'test-key')
+        monkeypatch.setattr(bot_module, '_client', fake)
+        monkeypatch.setattr(bot_module, 'AsyncGroq', fake)
+        return fake
+    return install
@@ -0,0 +1,147 @@
+"""
+Tests for coalescing rapid-fire chat questions into one Groq request
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.bot as bot_module
+from services.bot import StudyBot, _coalesce_ask
+
+
+STUDY_CONTENT = "Photosynthesis turns light into chemical energy inside the chloroplasts."
+
+
+def _questions(groq):
+    """The question at the end of each prompt, without the task context in front of it"""
+    return [prompt.rsplit('\n\n', 1)[-1] for prompt in groq.prompts]
+
+
+@pytest.fixture
+def coalesce_window(monkeypatch):
+    """A shorter window than the default, still ample for the test threads to join"""
+    monkeypatch.setattr(bot_module, 'ASK_COALESCE_WINDOW', 0.1)
+
+
+def _ask_together(key, questions, answer_batch):
+    """Ask the first question, then the rest while the first is still collecting"""
+    answers = [None] * len(questions)
+
+    def ask(i):
+        answers[i] = _coalesce_ask(key, questions[i], answer_batch)
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(questions))]
+    threads[0].start()
+    while key not in bot_module._pending_asks:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert key not in bot_module._pending_asks
+    return answers
+
+
+def test_leader_and_followers_each_get_their_own_answer(coalesce_window):
+    batches = []
+
+    def answer_batch(questions):
+        batches.append(list(questions))
+        return [f"answer to {q}" for q in questions]
+
+    questions = ['What is ATP?', 'What is a chloroplast?', 'Why are leaves green?']
+    answers = _ask_together('leader-followers', questions, answer_batch)
+
+    assert len(batches) == 1
+    assert batches[0][0] == questions[0]
+    assert sorted(batches[0]) == sorted(questions)
+    assert answers == [f"answer to {q}" for q in questions]
+
+
+def test_followers_are_released_when_the_batch_raises(coalesce_window):
+    def answer_batch(questions):
+        raise RuntimeError('rate limited')
+
+    answers = _ask_together('raises', ['q1', 'q2', 'q3'], answer_batch)
+
+    assert all('rate limited' in answer for answer in answers)
+
+
+def test_lone_question_is_sent_as_is(monkeypatch, fake_groq):
+    monkeypatch.setattr(bot_module, 'ASK_COALESCE_WINDOW', 0)
+    groq = fake_groq('Chlorophyll absorbs light.')
+    bot = StudyBot(STUDY_CONTENT)
+
+    result = bot.answer_question('What does chlorophyll do?', batch_key='lone')
+
+    assert result['response'] == 'Chlorophyll absorbs light.'
+    assert _questions(groq) == ['What does chlorophyll do?']
+    assert bot.get_history() == [
+        {'role': 'user', 'content': 'What does chlorophyll do?'},
+        {'role': 'assistant', 'content': 'Chlorophyll absorbs light.'},
+    ]
+
+
+def test_batch_reply_is_split_per_question(fake_groq):
+    groq = fake_groq('ANSWER_1: Glucose.\nANSWER_2: Oxygen.')
+
+    answers = StudyBot(STUDY_CONTENT)._answer_batch(['What is made?', 'What is released?'])
+
+    assert answers == ['Glucose.', 'Oxygen.']
+    assert len(groq.prompts) == 1
+
+
+def test_unsplittable_reply_falls_back_to_one_request_per_question(fake_groq):
+    groq = fake_groq('Both glucose and oxygen.', 'Glucose.', 'Oxygen.')
+    questions = ['What is made?', 'What is released?']
+
+    answers = StudyBot(STUDY_CONTENT)._answer_batch(questions)
+
+    assert answers == ['Glucose.', 'Oxygen.']
+    assert _questions(groq)[1:] == questions
+
+
+def test_partly_split_reply_only_retries_missing_answers(fake_groq):
+    groq = fake_groq('ANSWER_2: Oxygen.', 'Glucose.')
+
+    answers = StudyBot(STUDY_CONTENT)._answer_batch(['What is made?', 'What is released?'])
+
+    assert answers == ['Glucose.', 'Oxygen.']
+    assert _questions(groq)[1:] == ['What is made?']
+
+
+@pytest.mark.parametrize('coalescing', [False, True])
+def test_ask_action_only_coalesces_when_enabled(client, fake_groq, monkeypatch, coalescing):
+    """Off by default, chat questions go straight to Groq without waiting out the window"""
+    from app import app
+    from models import db, StudyFile
+
+    app.config['CHAT_COALESCING'] = coalescing
+    monkeypatch.setattr(bot_module, 'ASK_COALESCE_WINDOW', 0)
+    batch_keys = []
+    real_coalesce = bot_module._coalesce_ask
+    def spy(key, question, answer_batch):
+        batch_keys.append(key)
+        return real_coalesce(key, question, answer_batch)
+    monkeypatch.setattr(bot_module, '_coalesce_ask', spy)
+    fake_groq('Chlorophyll absorbs light.')
+    with app.app_context():
+        study_file = StudyFile(user_id=client.user_id, filename='notes.txt',
+                               original_name='notes.txt', content=STUDY_CONTENT)
+        db.session.add(study_file)
+        db.session.commit()
+        file_id = study_file.id
+
+    response = client.post('/bot/action', json={
+        'file_id': file_id, 'action': 'ask', 'input': 'What does chlorophyll do?'
+    })
+
+    assert response.get_json()['response'] == 'Chlorophyll absorbs light.'
+    assert batch_keys == ([f'bot_history_{client.user_id}_{file_id}'] if coalescing else [])
@@ -0,0 +1,59 @@
+"""
+Tests for the conversation history window sent with each Groq request
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bot import StudyBot
+
+
+def _msg(role, content):
+    return {'role': role, 'content': content}
+
+
+def _window(history):
+    return StudyBot("Study notes", history)._recent_history()
+
+
+def test_short_history_is_sent_whole():
+    history = [_msg('user', 'hi'), _msg('assistant', 'hello'), _msg('user', 'what is ATP?')]
+
+    assert _window(history) == history
+
+
+def test_window_keeps_the_newest_messages_that_fit_the_budget():
+    """The walk stops at the first message over budget, even if older ones would fit"""
+    budget_chars = StudyBot.MAX_HISTORY_TOKENS * 4
+    history = [
+        _msg('user', 'old and short'),
+        _msg('assistant', 'x' * (budget_chars // 2)),
+        _msg('user', 'y' * (budget_chars * 4 // 5)),
+        _msg('assistant', 'z' * (budget_chars // 4)),
+        _msg('user', 'newest'),
+    ]
+
+    assert _window(history) == history[3:]
+
+
+def test_newest_quiz_is_pinned_when_it_falls_outside_the_window():
+    quiz = _msg('assistant', 'QUIZ_START\nQ1: What is ATP?\nA1: Energy\nQUIZ_END')
+    history = [_msg('user', 'quiz me'), quiz, _msg('user', 'u' * 6000), _msg('user', 'A1: Energy')]
+
+    assert _window(history) == [quiz, history[-1]]
+
+
+def test_older_quiz_is_not_pinned_when_a_newer_one_is_in_the_window():
+    old_quiz = _msg('assistant', 'QUIZ_START old quiz ' + 'q' * 4000)
+    new_quiz = _msg('assistant', 'QUIZ_START new quiz')
+    history = [old_quiz, _msg('user', 'u' * 3000), new_quiz, _msg('user', 'hi')]
+
+    assert _window(history) == history[1:]
+
+
+def test_quiz_request_from_the_user_is_not_pinned():
+    history = [_msg('user', 'QUIZ_START ' + 'u' * 7000), _msg('user', 'hi')]
+
+    assert _window(history) == [history[-1]]
@@ -0,0 +1,130 @@
+"""
+Tests for streamed quiz generation and remembering streamed replies
+"""
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bot import StudyBot, _stream_matches, _QUIZ_RE, _CARD_RE
+
+
+STUDY_CONTENT = (
+    "Photosynthesis is the process plants use to turn light into chemical energy. "
+    "It takes place in the chloroplasts and produces glucose and oxygen."
+)
+
+QUIZ_REPLY = "QUIZ_START\nQ1: What organelle hosts photosynthesis?\nA1: Chloroplast\nQ2: True or False: It produces oxygen.\nA2: True\nQUIZ_END"
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1000])
+def test_stream_matches_finds_every_match_across_chunk_boundaries(chunk_size):
+    parts = []
+
+    matches = [m.groups() for m in _stream_matches(_chunks(QUIZ_REPLY, chunk_size), _QUIZ_RE, parts)]
+
+    assert matches == _QUIZ_RE.findall(QUIZ_REPLY)
+    assert ''.join(parts) == QUIZ_REPLY
+
+
+def test_stream_matches_never_yields_a_half_received_line():
+    """A match is only yielded once the chunk completing its line has arrived"""
+    chunks = ["CARD_1_FRONT: Mitosis\nCARD_1_BACK: Cell divi", "sion\n"]
+    seen = []
+
+    for match in _stream_matches(iter(chunks), _CARD_RE, seen):
+        assert len(seen) == 2
+        assert match.group(2) == 'Cell division'
+
+
+def test_stream_matches_yields_final_line_without_trailing_newline():
+    reply = "Q1: What gas do plants release?\nA1: Oxygen"
+
+    matches = [m.groups() for m in _stream_matches(_chunks(reply, 5), _QUIZ_RE, [])]
+
+    assert matches == [('What gas do plants release?', 'Oxygen')]
+
+
+def test_stream_quiz_yields_questions_then_done(fake_groq):
+    fake_groq(QUIZ_REPLY)
+    bot = StudyBot(STUDY_CONTENT)
+
+    events = list(bot.stream_quiz(num_questions=5, question_type='mixed'))
+
+    assert [event for event, _ in events] == ['question', 'question', 'done']
+    assert events[-1][1]['type'] == 'quiz'
+    assert events[-1][1]['questions'] == [q for _, q in events[:-1]]
+    assert bot.get_history()[-1] == {'role': 'assistant', 'content': QUIZ_REPLY}
+
+
+def test_stream_quiz_error_ends_with_a_message_and_no_memory(fake_groq):
+    fake_groq(error=RuntimeError('rate limited'))
+    bot = StudyBot(STUDY_CONTENT)
+
+    events = list(bot.stream_quiz(num_questions=5, question_type='multiple_choice'))
+
+    assert len(events) == 1
+    event, data = events[0]
+    assert event == 'done'
+    assert data['type'] == 'message'
+    assert 'rate limited' in data['response']
+    assert bot.get_history() == []
+
+
+def _sse_events(body):
+    for block in body.strip().split('\n\n'):
+        event, data = block.split('\n', 1)
+        yield event[len('event: '):], json.loads(data[len('data: '):])
+
+
+def _add_notes(client):
+    from app import app
+    from models import db, StudyFile
+
+    with app.app_context():
+        study_file = StudyFile(user_id=client.user_id, filename='notes.txt',
+                               original_name='notes.txt', content=STUDY_CONTENT)
+        db.session.add(study_file)
+        db.session.commit()
+        return study_file.id
+
+
+def test_streamed_quiz_is_remembered_via_memory_event(client, fake_groq):
+    """The 'memory' event carries the exchange and /bot/remember stores it in the session"""
+    file_id = _add_notes(client)
+    fake_groq(QUIZ_REPLY)
+
+    response = client.get(f'/bot/stream/{file_id}?action=quiz&count=5&type=mixed')
+    events = list(_sse_events(response.get_data(as_text=True)))
+
+    assert [event for event, _ in events][-2:] == ['memory', 'done']
+    memory = events[-2][1]
+    assert [m['role'] for m in memory] == ['user', 'assistant']
+    assert memory[1]['content'] == QUIZ_REPLY
+
+    assert client.post(f'/bot/remember/{file_id}', json={'messages': memory}).status_code == 200
+    with client.session_transaction() as sess:
+        assert sess[f'bot_history_{client.user_id}_{file_id}'] == memory
+
+    assert client.post(f'/bot/remember/{file_id}', json={'messages': [{'role': 'system', 'content': 'x'}]}).status_code == 400
+
+
+def test_flashcards_stream_sends_cards_then_memory_and_done(client, fake_groq):
+    cards_reply = "FLASHCARDS_START\nCARD_1_FRONT: Chloroplast\nCARD_1_BACK: Where photosynthesis happens\nFLASHCARDS_END"
+    file_id = _add_notes(client)
+    fake_groq(cards_reply)
+
+    response = client.get(f'/bot/stream/{file_id}?action=flashcards')
+    events = list(_sse_events(response.get_data(as_text=True)))
+
+    assert [event for event, _ in events] == ['card', 'memory', 'done']
+    assert events[0][1] == {'front': 'Chloroplast', 'back': 'Where photosynthesis happens'}
+    assert events[1][1][1]['content'] == cards_reply
+    assert events[2][1]['cards'] == [events[0][1]]
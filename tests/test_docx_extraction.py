@@ -0,0 +1,57 @@
+"""
+Tests for the streaming .docx text extraction
+"""
+import sys
+import os
+from io import BytesIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.shared import Inches
+
+from routes.study import _stream_docx_paragraphs, extract_text_from_file
+
+
+def _build_docx():
+    doc = Document()
+
+    para = doc.add_paragraph()
+    para.paragraph_format.tab_stops.add_tab_stop(Inches(2))  # <w:tabs> must not add text
+    run = para.add_run('Name:')
+    run.add_tab()
+    run.add_text('Value')
+
+    para = doc.add_paragraph()
+    run = para.add_run('Line1')
+    run.add_break()
+    run.add_text('Line2')
+    run._r.append(OxmlElement('w:cr'))
+    run.add_text('Line3')
+
+    doc.add_paragraph('Before page break').add_run().add_break(WD_BREAK.PAGE)
+    doc.add_paragraph('   ')
+    doc.add_paragraph('Plain paragraph')
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_streamed_docx_text_matches_python_docx():
+    """Tabs and line breaks come through exactly as python-docx reports them"""
+    data = _build_docx()
+
+    expected = [p.text for p in Document(BytesIO(data)).paragraphs if p.text.strip()]
+
+    assert _stream_docx_paragraphs(data) == expected
+    assert expected[:2] == ['Name:\tValue', 'Line1\nLine2\nLine3']
+
+
+def test_extract_text_from_docx_joins_paragraphs():
+    text = extract_text_from_file(BytesIO(_build_docx()), 'notes.docx')
+
+    assert text == 'Name:\tValue\n\nLine1\nLine2\nLine3\n\nBefore page break\n\nPlain paragraph'
@@ -0,0 +1,137 @@
+"""
+Tests for PDF upload processing and the file status endpoint
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from io import BytesIO
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from models import db, User, StudyFile
+import routes.study as study_routes
+
+
+PDF_TEXT = 'Photosynthesis converts light energy into chemical energy.'
+
+
+class _QueuedExecutor:
+    """Holds submitted jobs so a test can run them after the response"""
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+    def run_all(self):
+        for fn, args in self.jobs:
+            fn(*args)
+        self.jobs.clear()
+
+
+@pytest.fixture(autouse=True)
+def fake_pdf_extraction(monkeypatch):
+    """Parsing a real PDF isn't the point here"""
+    real_extract = study_routes.extract_text_from_file
+    def fake_extract(file, filename):
+        if filename.endswith('.pdf'):
+            file.read()
+            return PDF_TEXT
+        return real_extract(file, filename)
+    monkeypatch.setattr(study_routes, 'extract_text_from_file', fake_extract)
+
+
+def _upload_pdf(client):
+    return client.post('/upload', data={
+        'subject_id': str(client.subject_id),
+        'files': (BytesIO(b'%PDF-1.4 fake'), 'notes.pdf'),
+    }, content_type='multipart/form-data')
+
+
+def _add_file(client, **fields):
+    with app.app_context():
+        study_file = StudyFile(user_id=client.user_id, subject_id=client.subject_id,
+                               filename='notes.pdf', original_name='notes.pdf', **fields)
+        db.session.add(study_file)
+        db.session.commit()
+        return study_file.id
+
+
+def test_background_upload_returns_202_then_becomes_ready(client, monkeypatch):
+    """With BACKGROUND_EXTRACTION on, PDFs are saved to disk and extracted after the response"""
+    app.config['BACKGROUND_EXTRACTION'] = True
+    executor = _QueuedExecutor()
+    monkeypatch.setattr(study_routes, '_extract_executor', executor)
+
+    response = _upload_pdf(client)
+
+    assert response.status_code == 202
+    uploaded = response.get_json()['files'][0]
+    assert uploaded['status'] == 'processing'
+    file_id = uploaded['file_id']
+    pending = study_routes._pending_path(app, file_id)
+    assert os.path.exists(pending)
+    assert client.get(f'/file/{file_id}/status').get_json()['status'] == 'processing'
+
+    executor.run_all()
+
+    assert client.get(f'/file/{file_id}/status').get_json() == {'file_id': file_id, 'status': 'ready'}
+    assert not os.path.exists(pending)
+    with app.app_context():
+        assert db.session.get(StudyFile, file_id).content == PDF_TEXT
+
+
+def test_upload_extracts_synchronously_without_background_worker(client):
+    """On hosts without a worker (the default), PDFs are extracted during the upload"""
+    response = _upload_pdf(client)
+
+    assert response.status_code == 200
+    uploaded = response.get_json()['files'][0]
+    assert uploaded['status'] == 'ready'
+    assert client.get(f"/file/{uploaded['file_id']}/status").get_json()['status'] == 'ready'
+
+
+def test_stale_processing_file_is_marked_failed(client):
+    """Rows stuck in processing past the timeout are failed rather than left forever"""
+    old = datetime.utcnow() - timedelta(minutes=app.config['EXTRACTION_TIMEOUT_MINUTES'] + 1)
+    stale_id = _add_file(client, status='processing', uploaded_at=old)
+    fresh_id = _add_file(client, status='processing')
+
+    assert client.get(f'/file/{stale_id}/status').get_json()['status'] == 'failed'
+    assert client.get(f'/file/{fresh_id}/status').get_json()['status'] == 'processing'
+
+
+def test_status_of_another_users_file_is_not_found(client):
+    with app.app_context():
+        other = User(username='other', email='other@example.com', password_hash='x')
+        db.session.add(other)
+        db.session.commit()
+        study_file = StudyFile(user_id=other.id, filename='a.txt', original_name='a.txt', content='x' * 20)
+        db.session.add(study_file)
+        db.session.commit()
+        file_id = study_file.id
+
+    assert client.get(f'/file/{file_id}/status').status_code == 404
+
+
+@pytest.mark.parametrize('status, expected', [
+    (None, 400),  # Rows from before the status column count as ready
+    ('ready', 400),
+    ('processing', 409),
+    ('failed', 409),
+])
+def test_bot_action_only_blocks_files_without_text(client, status, expected):
+    """Files that aren't ready get 409; ready ones reach action dispatch (400 for a bad action)"""
+    file_id = _add_file(client, status=status, content='Some study content here.')
+    if status is None:
+        with app.app_context():
+            # The column default would otherwise fill in 'ready'
+            db.session.execute(db.update(StudyFile).where(StudyFile.id == file_id).values(status=None))
+            db.session.commit()
+
+    response = client.post('/bot/action', json={'file_id': file_id, 'action': 'nope'})
+
+    assert response.status_code == expected
@@ -6,11 +6,12 @@ Validates: Requirements 5.6
 """
 import pytest
 from hypothesis import given, strategies as st, settings
+from copy import copy
 from dataclasses import dataclass, field
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Flashcard:
     """Represents a flashcard"""
     index: int
@@ -22,7 +23,7 @@ class Flashcard:
     marked_learning: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class FullscreenState:
     """Tracks fullscreen state for restoration"""
     original_card_index: int = 0
@@ -35,18 +36,7 @@ class FlashcardContainer:
     """Simulates the original flashcard container in the chat"""
     
     def __init__(self, cards: List[Flashcard]):
-        self.cards = [
-            Flashcard(
-                index=c.index,
-                front=c.front,
-                back=c.back,
-                flipped=c.flipped,
-                active=c.active,
-                marked_knew=c.marked_knew,
-                marked_learning=c.marked_learning
-            )
-            for c in cards
-        ]
+        self.cards = [copy(c) for c in cards]
         self.current_index = 0
         self.knew_count = 0
         self.learning_count = 0
@@ -76,18 +66,7 @@ class FullscreenFlashcardMode:
         self.state.learning_count = container.learning_count
         
         # Clone cards to fullscreen
-        self.fullscreen_cards = [
-            Flashcard(
-                index=c.index,
-                front=c.front,
-                back=c.back,
-                flipped=c.flipped,
-                active=c.active,
-                marked_knew=c.marked_knew,
-                marked_learning=c.marked_learning
-            )
-            for c in container.cards
-        ]
+        self.fullscreen_cards = [copy(c) for c in container.cards]
         
         self.current_index = container.current_index
         self.total = len(self.fullscreen_cards)
@@ -121,26 +100,54 @@ class FullscreenFlashcardMode:
             card.marked_learning = True
             self.state.learning_count += 1
     
+    def mark_and_advance(self, responses: List[bool]) -> None:
+        """
+        Mark each response in turn, moving to the next card after each one.
+        Same as alternating mark_response() and navigate(1), in one pass.
+        """
+        if not self.fullscreen_cards or not responses:
+            return
+        
+        cards = self.fullscreen_cards
+        start = self.current_index
+        end = min(start + len(responses), self.total - 1)
+        
+        # Responses past the last card keep landing on it, like navigate(1) does
+        for offset, knew in enumerate(responses):
+            card = cards[min(start + offset, end)]
+            if knew:
+                card.marked_knew = True
+            else:
+                card.marked_learning = True
+        
+        knew_count = sum(responses)
+        self.state.knew_count += knew_count
+        self.state.learning_count += len(responses) - knew_count
+        
+        # Every card moved onto gets its flip state reset
+        for card in cards[start + 1:end + 1]:
+            card.flipped = False
+        cards[start].active = False
+        cards[end].active = True
+        self.current_index = end
+    
     def exit_fullscreen(self, container: FlashcardContainer) -> None:
         """Exit fullscreen and restore state to container"""
         if not self.state.is_active:
             return
         
-        # Sync current position back to container
-        for card in container.cards:
-            card.active = False
+        # Sync current position back to container (only its current card is active)
+        if container.current_index < len(container.cards):
+            container.cards[container.current_index].active = False
         
         if self.current_index < len(container.cards):
             container.cards[self.current_index].active = True
         container.current_index = self.current_index
         
         # Sync marked states from fullscreen to original
-        for i, fs_card in enumerate(self.fullscreen_cards):
-            if i < len(container.cards):
-                if fs_card.marked_knew:
-                    container.cards[i].marked_knew = True
-                if fs_card.marked_learning:
-                    container.cards[i].marked_learning = True
+        for card, fs_card in zip(container.cards, self.fullscreen_cards):
+            card.marked_knew |= fs_card.marked_knew
+            card.marked_learning |= fs_card.marked_learning
         
         # Sync counts
         container.knew_count = self.state.knew_count
@@ -242,14 +249,11 @@ def test_property_10_marked_states_synced_on_exit(cards, responses):
     # Enter fullscreen
     fullscreen.enter_fullscreen(container)
     
-    # Mark some cards with responses
-    marked_indices = []
-    for i, knew in enumerate(responses):
-        if fullscreen.current_index < len(cards):
-            marked_indices.append((fullscreen.current_index, knew))
-            fullscreen.mark_response(knew)
-            # Move to next card if possible
-            fullscreen.navigate(1)
+    # Mark some cards with responses, moving to the next card after each
+    # (responses past the last card keep landing on it)
+    last = len(cards) - 1
+    marked_indices = [(min(i, last), knew) for i, knew in enumerate(responses)]
+    fullscreen.mark_and_advance(responses)
     
     # Exit fullscreen
     fullscreen.exit_fullscreen(container)
@@ -291,17 +295,10 @@ def test_property_10_counts_synced_on_exit(cards, responses):
     fullscreen.enter_fullscreen(container)
     
     # Count expected responses
-    expected_knew = 0
-    expected_learning = 0
+    expected_knew = responses.count(True)
+    expected_learning = responses.count(False)
     
-    for knew in responses:
-        if fullscreen.current_index < len(cards):
-            fullscreen.mark_response(knew)
-            if knew:
-                expected_knew += 1
-            else:
-                expected_learning += 1
-            fullscreen.navigate(1)
+    fullscreen.mark_and_advance(responses)
     
     # Exit fullscreen
     fullscreen.exit_fullscreen(container)
@@ -315,6 +312,48 @@ def test_property_10_counts_synced_on_exit(cards, responses):
     )
 
 
+@settings(max_examples=100)
+@given(
+    cards=flashcards_strategy(),
+    starting_position=st.integers(min_value=0, max_value=14),
+    flipped=st.lists(st.booleans(), min_size=15, max_size=15),
+    responses=st.lists(st.booleans(), min_size=0, max_size=20)
+)
+def test_property_10_mark_and_advance_matches_per_response_calls(cards, starting_position, flipped, responses):
+    """
+    Property 10: Fullscreen State Restoration (Batched Marking)
+
+    *For any* responses, mark_and_advance should leave the same cards, flags
+    and counts as calling mark_response then navigate(1) for each response,
+    so the other tests can rely on it.
+
+    **Validates: Requirements 5.6**
+    """
+    starting_position %= len(cards)
+    for card, is_flipped in zip(cards, flipped):
+        card.flipped = is_flipped
+
+    container = FlashcardContainer(cards)
+    for card in container.cards:
+        card.active = False
+    container.cards[starting_position].active = True
+    container.current_index = starting_position
+
+    batched = FullscreenFlashcardMode()
+    batched.enter_fullscreen(container)
+    batched.mark_and_advance(responses)
+
+    per_call = FullscreenFlashcardMode()
+    per_call.enter_fullscreen(container)
+    for knew in responses:
+        per_call.mark_response(knew)
+        per_call.navigate(1)
+
+    assert batched.fullscreen_cards == per_call.fullscreen_cards
+    assert batched.current_index == per_call.current_index
+    assert batched.state == per_call.state
+
+
 @settings(max_examples=100)
 @given(
     cards=flashcards_strategy(),
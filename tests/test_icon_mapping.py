@@ -5,7 +5,6 @@ Feature: study-page-improvements, Property 1: Subject Icon Mapping Consistency
 Validates: Requirements 1.1
 """
 import pytest
-from hypothesis import given, strategies as st, settings
 import sys
 import os
 
@@ -17,10 +16,11 @@ from models import Subject, ICONOIR_SUBJECT_ICONS
 
 # Get all default subject names
 DEFAULT_SUBJECT_NAMES = [subj['name'] for subj in Subject.DEFAULT_SUBJECTS]
+_DEFAULTS_BY_NAME = {subj['name']: subj for subj in Subject.DEFAULT_SUBJECTS}
 
 
-@settings(max_examples=100)
-@given(st.sampled_from(DEFAULT_SUBJECT_NAMES))
+# The default subjects are a small fixed set, so check each one exactly once
+@pytest.mark.parametrize('subject_name', DEFAULT_SUBJECT_NAMES)
 def test_property_1_subject_icon_mapping_consistency(subject_name):
     """
     Property 1: Subject Icon Mapping Consistency
@@ -31,10 +31,7 @@ def test_property_1_subject_icon_mapping_consistency(subject_name):
     **Validates: Requirements 1.1**
     """
     # Find the subject in DEFAULT_SUBJECTS
-    subject_data = next(
-        (s for s in Subject.DEFAULT_SUBJECTS if s['name'] == subject_name), 
-        None
-    )
+    subject_data = _DEFAULTS_BY_NAME.get(subject_name)
     
     assert subject_data is not None, f"Subject {subject_name} not found in DEFAULT_SUBJECTS"
     
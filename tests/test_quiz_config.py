@@ -4,7 +4,9 @@ Property-based tests for Quiz Configuration Validation
 Feature: study-page-improvements, Property 6: Quiz Configuration Validation
 Validates: Requirements 4.2, 4.3
 """
+import itertools
 import pytest
+from functools import lru_cache
 from hypothesis import given, strategies as st, settings
 from typing import Optional
 
@@ -13,6 +15,10 @@ from typing import Optional
 VALID_QUESTION_COUNTS = [5, 10, 15, 20]
 VALID_QUESTION_TYPES = ['multiple_choice', 'identification', 'true_false', 'mixed']
 
+# Hashed lookups for membership checks; the lists above stay for messages and ordering
+VALID_QUESTION_COUNTS_SET = frozenset(VALID_QUESTION_COUNTS)
+VALID_QUESTION_TYPES_SET = frozenset(VALID_QUESTION_TYPES)
+
 
 class QuizConfigValidator:
     """
@@ -24,14 +30,15 @@ class QuizConfigValidator:
     @staticmethod
     def validate_count(count: int) -> bool:
         """Validate question count is one of the allowed values"""
-        return count in VALID_QUESTION_COUNTS
+        return count in VALID_QUESTION_COUNTS_SET
     
     @staticmethod
     def validate_type(question_type: str) -> bool:
         """Validate question type is one of the allowed values"""
-        return question_type in VALID_QUESTION_TYPES
+        return question_type in VALID_QUESTION_TYPES_SET
     
     @staticmethod
+    @lru_cache(maxsize=1024, typed=True)
     def validate_config(count: int, question_type: str) -> tuple[bool, Optional[str]]:
         """
         Validate a complete quiz configuration.
@@ -52,17 +59,23 @@ valid_count_strategy = st.sampled_from(VALID_QUESTION_COUNTS)
 # Strategy for valid question types
 valid_type_strategy = st.sampled_from(VALID_QUESTION_TYPES)
 
-# Strategy for invalid question counts
-invalid_count_strategy = st.integers().filter(lambda x: x not in VALID_QUESTION_COUNTS)
+# Strategy for invalid question counts (valid draws are shifted out of range
+# rather than filtered, so no examples are rejected)
+invalid_count_strategy = st.integers().map(
+    lambda x: x + 100 if x in VALID_QUESTION_COUNTS_SET else x
+)
 
 # Strategy for invalid question types
-invalid_type_strategy = st.text(min_size=1, max_size=50).filter(
-    lambda x: x not in VALID_QUESTION_TYPES
+invalid_type_strategy = st.text(min_size=1, max_size=50).map(
+    lambda x: x + "_x" if x in VALID_QUESTION_TYPES_SET else x
 )
 
 
-@settings(max_examples=100)
-@given(count=valid_count_strategy, question_type=valid_type_strategy)
+# Only 16 valid configs exist, so check every one of them
+@pytest.mark.parametrize(
+    "count,question_type",
+    list(itertools.product(VALID_QUESTION_COUNTS, VALID_QUESTION_TYPES))
+)
 def test_property_6_valid_config_accepted(count, question_type):
     """
     Property 6: Quiz Configuration Validation (Valid Configs)
@@ -82,7 +95,7 @@ def test_property_6_valid_config_accepted(count, question_type):
     assert error is None
 
 
-@settings(max_examples=100)
+@settings(max_examples=25)
 @given(count=invalid_count_strategy, question_type=valid_type_strategy)
 def test_property_6_invalid_count_rejected(count, question_type):
     """
@@ -102,7 +115,7 @@ def test_property_6_invalid_count_rejected(count, question_type):
     assert str(count) in error
 
 
-@settings(max_examples=100)
+@settings(max_examples=25)
 @given(count=valid_count_strategy, question_type=invalid_type_strategy)
 def test_property_6_invalid_type_rejected(count, question_type):
     """
@@ -123,7 +136,7 @@ def test_property_6_invalid_type_rejected(count, question_type):
     assert question_type in error
 
 
-@settings(max_examples=100)
+@settings(max_examples=25)
 @given(count=invalid_count_strategy, question_type=invalid_type_strategy)
 def test_property_6_both_invalid_rejected(count, question_type):
     """
@@ -4,8 +4,9 @@ Property-based tests for Quiz Generation Matching Configuration
 Feature: study-page-improvements, Property 7: Quiz Generation Matches Configuration
 Validates: Requirements 4.4
 """
+import itertools
 import pytest
-from hypothesis import given, strategies as st, settings, assume
+import re
 import sys
 import os
 
@@ -67,6 +68,46 @@ Recursion is when a function calls itself. Every recursive function needs a base
 """
 
 
+def _mock_quiz(question_type, num_questions):
+    """Build a predictable QUIZ_START/QUIZ_END response for the given config"""
+    questions = []
+    for i in range(1, num_questions + 1):
+        if question_type == 'multiple_choice':
+            questions.append(f"Q{i}: What is a data structure? (A) A way to organize data (B) A programming language (C) A computer (D) A network")
+            questions.append(f"A{i}: A")
+        elif question_type == 'identification':
+            questions.append(f"Q{i}: Identify: A Last-In-First-Out data structure")
+            questions.append(f"A{i}: Stack")
+        elif question_type == 'true_false':
+            questions.append(f"Q{i}: True or False: Arrays allow random access to elements")
+            questions.append(f"A{i}: True")
+        else:  # mixed
+            if i % 4 == 1:
+                questions.append(f"Q{i}: What is a data structure? (A) A way to organize data (B) A programming language (C) A computer (D) A network")
+                questions.append(f"A{i}: A")
+            elif i % 4 == 2:
+                questions.append(f"Q{i}: Identify: A Last-In-First-Out data structure")
+                questions.append(f"A{i}: Stack")
+            elif i % 4 == 3:
+                questions.append(f"Q{i}: True or False: Arrays allow random access to elements")
+                questions.append(f"A{i}: True")
+            else:
+                questions.append(f"Q{i}: The _____ data structure uses FIFO ordering")
+                questions.append(f"A{i}: Queue")
+    
+    return "QUIZ_START\n" + "\n".join(questions) + "\nQUIZ_END"
+
+
+# Requested question count in a quiz prompt
+_COUNT_RE = re.compile(r'Create exactly (\d+)')
+
+# Mock responses for every valid config, built once
+_TEMPLATES = {
+    (question_type, num_questions): _mock_quiz(question_type, num_questions)
+    for question_type, num_questions in itertools.product(VALID_QUESTION_TYPES, VALID_QUESTION_COUNTS)
+}
+
+
 class MockStudyBot(StudyBot):
     """
     Mock StudyBot that simulates quiz generation without calling the actual API.
@@ -76,8 +117,7 @@ class MockStudyBot(StudyBot):
     def _chat(self, user_message, task_context=""):
         """Mock the chat method to return predictable quiz responses"""
         # Parse the requested number of questions from the prompt
-        import re
-        match = re.search(r'Create exactly (\d+)', user_message)
+        match = _COUNT_RE.search(user_message)
         num_questions = int(match.group(1)) if match else 5
         
         # Determine question type from prompt
@@ -90,45 +130,22 @@ class MockStudyBot(StudyBot):
         else:
             question_type = 'mixed'
         
-        # Generate mock questions based on type
-        questions = []
-        for i in range(1, num_questions + 1):
-            if question_type == 'multiple_choice':
-                questions.append(f"Q{i}: What is a data structure? (A) A way to organize data (B) A programming language (C) A computer (D) A network")
-                questions.append(f"A{i}: A")
-            elif question_type == 'identification':
-                questions.append(f"Q{i}: Identify: A Last-In-First-Out data structure")
-                questions.append(f"A{i}: Stack")
-            elif question_type == 'true_false':
-                questions.append(f"Q{i}: True or False: Arrays allow random access to elements")
-                questions.append(f"A{i}: True")
-            else:  # mixed
-                if i % 4 == 1:
-                    questions.append(f"Q{i}: What is a data structure? (A) A way to organize data (B) A programming language (C) A computer (D) A network")
-                    questions.append(f"A{i}: A")
-                elif i % 4 == 2:
-                    questions.append(f"Q{i}: Identify: A Last-In-First-Out data structure")
-                    questions.append(f"A{i}: Stack")
-                elif i % 4 == 3:
-                    questions.append(f"Q{i}: True or False: Arrays allow random access to elements")
-                    questions.append(f"A{i}: True")
-                else:
-                    questions.append(f"Q{i}: The _____ data structure uses FIFO ordering")
-                    questions.append(f"A{i}: Queue")
-        
-        return "QUIZ_START\n" + "\n".join(questions) + "\nQUIZ_END"
-
+        template = _TEMPLATES.get((question_type, num_questions))
+        return template if template is not None else _mock_quiz(question_type, num_questions)
 
-# Strategy for valid question counts
-valid_count_strategy = st.sampled_from(VALID_QUESTION_COUNTS)
 
-# Strategy for valid question types
-valid_type_strategy = st.sampled_from(VALID_QUESTION_TYPES)
+@pytest.fixture(scope="module")
+def mock_bot():
+    """One MockStudyBot shared by the module's tests (its _chat keeps no history)"""
+    return MockStudyBot(SAMPLE_STUDY_CONTENT)
 
 
-@settings(max_examples=100)
-@given(count=valid_count_strategy, question_type=valid_type_strategy)
-def test_property_7_quiz_generation_matches_config(count, question_type):
+# The config space is small and finite, so cover every combination exactly once
+@pytest.mark.parametrize(
+    "count,question_type",
+    list(itertools.product(VALID_QUESTION_COUNTS, VALID_QUESTION_TYPES))
+)
+def test_property_7_quiz_generation_matches_config(mock_bot, count, question_type):
     """
     Property 7: Quiz Generation Matches Configuration
     
@@ -138,8 +155,7 @@ def test_property_7_quiz_generation_matches_config(count, question_type):
     
     **Validates: Requirements 4.4**
     """
-    bot = MockStudyBot(SAMPLE_STUDY_CONTENT)
-    result = bot.generate_quiz(num_questions=count, question_type=question_type)
+    result = mock_bot.generate_quiz(num_questions=count, question_type=question_type)
     
     # Verify quiz was generated successfully
     assert result['type'] == 'quiz', f"Expected quiz type, got {result['type']}"
@@ -164,26 +180,15 @@ def test_property_7_quiz_generation_matches_config(count, question_type):
     
     # Verify question types match configuration
     if question_type != 'mixed':
-        for q in result['questions']:
-            detected_type = q.get('type', '')
-            # For specific types, verify all questions match
-            if question_type == 'multiple_choice':
-                assert detected_type == 'multiple_choice', (
-                    f"Expected multiple_choice question, got {detected_type}: {q['question']}"
-                )
-            elif question_type == 'identification':
-                assert detected_type == 'identification', (
-                    f"Expected identification question, got {detected_type}: {q['question']}"
-                )
-            elif question_type == 'true_false':
-                assert detected_type == 'true_false', (
-                    f"Expected true_false question, got {detected_type}: {q['question']}"
-                )
-
-
-@settings(max_examples=100)
-@given(count=valid_count_strategy)
-def test_property_7_mixed_type_allows_variety(count):
+        # For specific types, verify all questions match
+        detected_types = {q.get('type', '') for q in result['questions']}
+        assert detected_types == {question_type}, (
+            f"Expected only {question_type} questions, got {sorted(detected_types)}"
+        )
+
+
+@pytest.mark.parametrize("count", VALID_QUESTION_COUNTS)
+def test_property_7_mixed_type_allows_variety(mock_bot, count):
     """
     Property 7: Quiz Generation Matches Configuration (Mixed Type)
     
@@ -192,8 +197,7 @@ def test_property_7_mixed_type_allows_variety(count):
     
     **Validates: Requirements 4.4**
     """
-    bot = MockStudyBot(SAMPLE_STUDY_CONTENT)
-    result = bot.generate_quiz(num_questions=count, question_type='mixed')
+    result = mock_bot.generate_quiz(num_questions=count, question_type='mixed')
     
     # Verify quiz was generated
     assert result['type'] == 'quiz'
@@ -223,36 +227,113 @@ def test_insufficient_content_handling():
     assert 'Not enough content' in result['message']
 
 
-def test_invalid_count_defaults_to_5():
+def test_invalid_count_defaults_to_5(mock_bot):
     """
     Test that invalid question count defaults to 5.
     
     **Validates: Requirements 4.4**
     """
-    bot = MockStudyBot(SAMPLE_STUDY_CONTENT)
-    
     # Test with invalid count
-    result = bot.generate_quiz(num_questions=7, question_type='mixed')
+    result = mock_bot.generate_quiz(num_questions=7, question_type='mixed')
     
     # Should default to 5
     assert result['total'] == 5
     assert result['requested_count'] == 5
 
 
-def test_invalid_type_defaults_to_mixed():
+def test_invalid_type_defaults_to_mixed(mock_bot):
     """
     Test that invalid question type defaults to mixed.
     
     **Validates: Requirements 4.4**
     """
-    bot = MockStudyBot(SAMPLE_STUDY_CONTENT)
-    
     # Test with invalid type
-    result = bot.generate_quiz(num_questions=5, question_type='invalid_type')
+    result = mock_bot.generate_quiz(num_questions=5, question_type='invalid_type')
     
     # Should default to mixed
     assert result['question_type'] == 'mixed'
 
 
+# Short notes (under StudyBot.LOCAL_QUIZ_MAX_CHARS) so identification quizzes
+# are built locally instead of going to the LLM
+HISTORY_NOTES = """
+The French Revolution
+
+The revolution began in 1789 when the Estates-General met at Versailles.
+Crowds in Paris stormed the Bastille on 14 July 1789.
+Causes: Debt from wars and poor harvests angered the Third Estate.
+In 1793 the Jacobins under Robespierre began the Reign of Terror.
+The monarchy ended when King Louis was executed in January 1793.
+After years of war, Napoleon Bonaparte seized power in 1799.
+Many historians see the Declaration of the Rights of Man as its legacy.
+Read the Introduction and the Summary before the lecture.
+"""
+
+HISTORY_TERMS = {'Versailles', 'Bastille', 'Estate', 'Robespierre', 'January', 'Bonaparte', 'Declaration'}
+
+
+def test_local_identification_quiz_blanks_key_terms():
+    """
+    Identification quizzes on short notes blank out a key term in each sentence,
+    never a heading, a sentence's first word or a stop-word.
+
+    **Validates: Requirements 4.4**
+    """
+    assert len(HISTORY_NOTES) < StudyBot.LOCAL_QUIZ_MAX_CHARS
+    bot = MockStudyBot(HISTORY_NOTES)
+
+    result = bot.generate_quiz(num_questions=5, question_type='identification')
+
+    assert result['type'] == 'quiz'
+    assert result['total'] == 5
+    assert len({q['answer'] for q in result['questions']}) == 5
+    for q in result['questions']:
+        assert q['type'] == 'identification'
+        assert q['answer'] in HISTORY_TERMS
+        sentence = q['question'].removeprefix('Identify: ')
+        assert '_____' in sentence and not sentence.startswith('_____')
+        assert q['answer'] not in sentence
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_local_quiz_is_remembered_like_an_llm_quiz(streamed):
+    """
+    A locally built quiz lands in the conversation history as a QUIZ_START
+    reply, so answers and follow-up questions can be checked against it.
+
+    **Validates: Requirements 4.4**
+    """
+    bot = MockStudyBot(HISTORY_NOTES)
+
+    if streamed:
+        result = list(bot.stream_quiz(num_questions=5, question_type='identification'))[-1][1]
+    else:
+        result = bot.generate_quiz(num_questions=5, question_type='identification')
+
+    history = bot.get_history()
+    assert [m['role'] for m in history] == ['user', 'assistant']
+    remembered = bot._parse_quiz(history[1]['content'], 5, 'identification')
+    assert history[1]['content'].startswith('QUIZ_START')
+    assert [(q['question'], q['answer']) for q in remembered['questions']] == [
+        (q['question'], q['answer']) for q in result['questions']
+    ]
+
+
+def test_local_quiz_falls_back_to_llm_when_notes_are_too_thin():
+    """
+    When the notes don't yield enough questions, the quiz comes from the LLM instead.
+
+    **Validates: Requirements 4.4**
+    """
+    bot = MockStudyBot(HISTORY_NOTES)
+    assert bot._local_quiz(10) is None
+
+    result = bot.generate_quiz(num_questions=10, question_type='identification')
+
+    # MockStudyBot._chat answers every identification question with "Stack"
+    assert result['total'] == 10
+    assert {q['answer'] for q in result['questions']} == {'Stack'}
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
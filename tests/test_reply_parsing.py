@@ -0,0 +1,95 @@
+"""
+Tests for parsing quiz and flashcard replies, whole and streamed
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bot import StudyBot, _stream_matches, _QUIZ_RE, _CARD_RE
+
+
+STUDY_CONTENT = "Stacks and queues are linear data structures with different ordering rules. " * 3
+
+# (reply, expected (question, answer) pairs)
+QUIZ_REPLIES = [
+    (
+        "QUIZ_START\nQ1: Which structure is LIFO?\nA1: Stack\nQUIZ_END",
+        [('Which structure is LIFO?', 'Stack')],
+    ),
+    (
+        "QUIZ_START\nQ1: Which structure is FIFO?\n(A) Stack (B) Queue (C) Tree (D) Graph\nA1: B\nQUIZ_END",
+        [('Which structure is FIFO?\n(A) Stack (B) Queue (C) Tree (D) Graph', 'B')],
+    ),
+    (
+        "Q1: Which structure is FIFO?\nA) Stack\nB) Queue\n\nA1: B\nQ2: True or False: A stack is FIFO\nA2: False",
+        [('Which structure is FIFO?\nA) Stack\nB) Queue', 'B'), ('True or False: A stack is FIFO', 'False')],
+    ),
+    (
+        "**Q1:** Which structure is LIFO?\n**A1:** Stack",
+        [('Which structure is LIFO?', 'Stack')],
+    ),
+    (
+        "Q1: A question the model never answered\nQ2: Which structure is LIFO?\nA2: Stack",
+        [('Which structure is LIFO?', 'Stack')],
+    ),
+]
+
+CARD_REPLIES = [
+    (
+        "FLASHCARDS_START\nCARD_1_FRONT: Stack\nCARD_1_BACK: Last in, first out\nFLASHCARDS_END",
+        [('Stack', 'Last in, first out')],
+    ),
+    (
+        "**CARD_1_FRONT:** Stack\n**CARD_1_BACK:** Last in, first out",
+        [('Stack', 'Last in, first out')],
+    ),
+    (
+        "CARD_1_FRONT: Stack\n(think plates)\n\nCARD_1_BACK: Last in, first out\nCARD_2_FRONT: Queue\nCARD_2_BACK: First in, first out",
+        [('Stack', 'Last in, first out'), ('Queue', 'First in, first out')],
+    ),
+]
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('reply, expected', QUIZ_REPLIES)
+def test_quiz_reply_shapes_parse(reply, expected):
+    quiz = StudyBot(STUDY_CONTENT)._parse_quiz(reply, 5, 'mixed')
+
+    assert [(q['question'], q['answer']) for q in quiz['questions']] == expected
+
+
+@pytest.mark.parametrize('reply, expected', QUIZ_REPLIES)
+@pytest.mark.parametrize('chunk_size', [1, 5, 1000])
+def test_streamed_quiz_reply_shapes_match_whole_parse(reply, expected, chunk_size):
+    bot = StudyBot(STUDY_CONTENT)
+
+    streamed = [bot._quiz_item(*m.groups()) for m in _stream_matches(_chunks(reply, chunk_size), _QUIZ_RE, [])]
+
+    assert streamed == bot._parse_quiz(reply, 5, 'mixed')['questions']
+
+
+def test_options_on_their_own_lines_are_multiple_choice():
+    quiz = StudyBot(STUDY_CONTENT)._parse_quiz(QUIZ_REPLIES[2][0], 5, 'mixed')
+
+    assert [q['type'] for q in quiz['questions']] == ['multiple_choice', 'true_false']
+
+
+@pytest.mark.parametrize('reply, expected', CARD_REPLIES)
+def test_flashcard_reply_shapes_parse(reply, expected):
+    result = StudyBot(STUDY_CONTENT)._parse_flashcards(reply)
+
+    assert [(c['front'], c['back']) for c in result['cards']] == expected
+
+
+@pytest.mark.parametrize('reply, expected', CARD_REPLIES)
+@pytest.mark.parametrize('chunk_size', [1, 5, 1000])
+def test_streamed_flashcard_reply_shapes_parse(reply, expected, chunk_size):
+    streamed = [m.groups() for m in _stream_matches(_chunks(reply, chunk_size), _CARD_RE, [])]
+
+    assert streamed == expected
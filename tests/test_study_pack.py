@@ -0,0 +1,61 @@
+"""
+Tests for the combined quiz + flashcards study pack
+"""
+import asyncio
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.bot as bot_module
+
+
+STUDY_CONTENT = (
+    "Photosynthesis is the process plants use to turn light into chemical energy. "
+    "It takes place in the chloroplasts and produces glucose and oxygen."
+)
+
+QUIZ_REPLY = "QUIZ_START\nQ1: Where does photosynthesis happen?\nA1: Chloroplasts\nQUIZ_END"
+CARDS_REPLY = "FLASHCARDS_START\nCARD_1_FRONT: Photosynthesis\nCARD_1_BACK: Light to chemical energy\nFLASHCARDS_END"
+
+
+def _pack_reply(prompt):
+    return QUIZ_REPLY if 'QUIZ_START' in prompt else CARDS_REPLY
+
+
+def test_study_pack_action_returns_quiz_and_flashcards(client, fake_groq):
+    """Both halves are requested concurrently, parsed, and remembered in the session"""
+    from app import app
+    from models import db, StudyFile
+
+    groq = fake_groq(_pack_reply)
+    with app.app_context():
+        study_file = StudyFile(user_id=client.user_id, filename='notes.txt',
+                               original_name='notes.txt', content=STUDY_CONTENT)
+        db.session.add(study_file)
+        db.session.commit()
+        file_id = study_file.id
+
+    response = client.post('/bot/action', json={
+        'file_id': file_id, 'action': 'study_pack', 'config': {'count': 5, 'type': 'mixed'}
+    })
+
+    data = response.get_json()
+    assert data['type'] == 'study_pack'
+    assert data['quiz']['type'] == 'quiz'
+    assert data['quiz']['questions'][0]['answer'] == 'Chloroplasts'
+    assert data['flashcards']['cards'] == [{'front': 'Photosynthesis', 'back': 'Light to chemical energy'}]
+    assert groq.max_in_flight == 2
+
+    with client.session_transaction() as sess:
+        history = sess[f'bot_history_{client.user_id}_{file_id}']
+    assert sorted(m['content'] for m in history if m['role'] == 'assistant') == sorted([QUIZ_REPLY, CARDS_REPLY])
+
+
+def test_study_pack_with_too_little_content_returns_error():
+    bot = bot_module.StudyBot("Too short")
+
+    result = asyncio.run(bot.generate_study_pack())
+
+    assert result['type'] == 'error'